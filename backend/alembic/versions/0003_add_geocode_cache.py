@@ -0,0 +1,34 @@
+"""add geocode cache table
+
+Revision ID: 0003_add_geocode_cache
+Revises: 0002_add_location_coords
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003_add_geocode_cache"
+down_revision = "0002_add_location_coords"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "geocode_cache",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("query", sa.String(), nullable=False),
+        sa.Column("latitude", sa.Float(), nullable=True),
+        sa.Column("longitude", sa.Float(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_geocode_cache_id", "geocode_cache", ["id"])
+    op.create_index("ix_geocode_cache_query", "geocode_cache", ["query"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_geocode_cache_query", table_name="geocode_cache")
+    op.drop_index("ix_geocode_cache_id", table_name="geocode_cache")
+    op.drop_table("geocode_cache")
@@ -0,0 +1,32 @@
+"""unique weather alert per trip and date
+
+Revision ID: 0004_weather_alert_unique_day
+Revises: 0003_add_geocode_cache
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0004_weather_alert_unique_day"
+down_revision = "0003_add_geocode_cache"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the newest row for any (trip_id, date) duplicates created before the constraint existed.
+    op.execute(
+        sa.text(
+            "DELETE FROM weather_alerts WHERE id NOT IN "
+            "(SELECT MAX(id) FROM weather_alerts GROUP BY trip_id, date)"
+        )
+    )
+    with op.batch_alter_table("weather_alerts") as batch_op:
+        batch_op.create_unique_constraint("uq_weather_alerts_trip_id_date", ["trip_id", "date"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("weather_alerts") as batch_op:
+        batch_op.drop_constraint("uq_weather_alerts_trip_id_date", type_="unique")
@@ -0,0 +1,22 @@
+"""composite index for trip membership lookups
+
+Revision ID: 0005_trip_member_lookup_index
+Revises: 0004_weather_alert_unique_day
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0005_trip_member_lookup_index"
+down_revision = "0004_weather_alert_unique_day"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_trip_members_trip_id_user_id", "trip_members", ["trip_id", "user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trip_members_trip_id_user_id", table_name="trip_members")
@@ -0,0 +1,26 @@
+"""indexes for keyset trip listing
+
+Revision ID: 0006_trip_listing_indexes
+Revises: 0005_trip_member_lookup_index
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0006_trip_listing_indexes"
+down_revision = "0005_trip_member_lookup_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Owner branch of GET /trips: filter by owner, walk (start_date, id) in order.
+    op.create_index("ix_trips_owner_id_start_date_id", "trips", ["owner_id", "start_date", "id"])
+    # Membership branch: EXISTS probe for the caller's trips.
+    op.create_index("ix_trip_members_user_id_trip_id", "trip_members", ["user_id", "trip_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_trip_members_user_id_trip_id", table_name="trip_members")
+    op.drop_index("ix_trips_owner_id_start_date_id", table_name="trips")
@@ -0,0 +1,23 @@
+"""composite index for ordered event listing
+
+Revision ID: 0007_event_listing_index
+Revises: 0006_trip_listing_indexes
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from alembic import op
+
+
+revision = "0007_event_listing_index"
+down_revision = "0006_trip_listing_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Matches GET /trips/{id}/events ordering so pages are read in index order without a sort.
+    op.create_index("ix_events_trip_id_date_start_time", "events", ["trip_id", "date", "start_time", "id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_events_trip_id_date_start_time", table_name="events")
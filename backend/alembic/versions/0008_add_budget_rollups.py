@@ -0,0 +1,55 @@
+"""add budget rollups table
+
+Revision ID: 0008_add_budget_rollups
+Revises: 0007_event_listing_index
+Create Date: 2026-10-17 12:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0008_add_budget_rollups"
+down_revision = "0007_event_listing_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "budget_rollups",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("trip_id", sa.Integer(), sa.ForeignKey("trips.id"), nullable=False),
+        sa.Column("category", sa.String(), nullable=False),
+        sa.Column("planned_total", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("actual_total", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("envelope_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("expense_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.UniqueConstraint("trip_id", "category", name="uq_budget_rollups_trip_id_category"),
+    )
+    op.create_index("ix_budget_rollups_id", "budget_rollups", ["id"])
+    op.create_index("ix_budget_rollups_trip_id", "budget_rollups", ["trip_id"])
+
+    # Backfill from existing envelopes and expenses; expenses without an envelope roll up
+    # under "uncategorized", matching the budget summary.
+    op.execute(
+        """
+        INSERT INTO budget_rollups (trip_id, category, planned_total, actual_total, envelope_count, expense_count)
+        SELECT trip_id, category, SUM(planned), SUM(actual), SUM(envelopes), SUM(expenses)
+        FROM (
+            SELECT trip_id, category, planned_amount AS planned, 0 AS actual, 1 AS envelopes, 0 AS expenses
+            FROM budget_envelopes
+            UNION ALL
+            SELECT x.trip_id, COALESCE(e.category, 'uncategorized'), 0, x.amount, 0, 1
+            FROM expenses x
+            LEFT JOIN budget_envelopes e ON e.id = x.envelope_id
+        ) AS rows
+        GROUP BY trip_id, category
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_budget_rollups_trip_id", table_name="budget_rollups")
+    op.drop_index("ix_budget_rollups_id", table_name="budget_rollups")
+    op.drop_table("budget_rollups")
@@ -1,6 +1,8 @@
 """Application configuration and settings."""
 
 from functools import lru_cache
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,6 +14,89 @@ class Settings(BaseSettings):
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60 * 24
 
+    # Password hashing. Stored hashes with a different bcrypt cost are re-hashed on the next login.
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 32
+
+    # Authenticated-user caches used by get_current_user.
+    auth_cache_size: int = 4096
+    auth_token_cache_ttl_seconds: int = 300
+    auth_user_cache_ttl_seconds: int = 60
+
+    # Connection pool. "queue" keeps a QueuePool of persistent connections; "null" opens a connection
+    # per checkout, which is what a pgbouncer transaction pooler (Supabase port 6543) expects.
+    db_pool_class: Literal["queue", "null"] = "queue"
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout_seconds: float = 30.0
+    db_pool_recycle_seconds: int = 1800
+    db_pool_pre_ping: bool = True
+
+    # Worker threads for synchronous ORM calls made from async routes and jobs.
+    db_thread_pool_size: int = 16
+    # Size of FastAPI/anyio's threadpool that runs plain `def` routes and dependencies.
+    threadpool_size: int = 40
+
+    # Async engine for async routes (asyncpg / aiosqlite). When unset, the URL is derived
+    # from database_url by swapping in the asyncio driver.
+    async_db_enabled: bool = False
+    async_database_url: Optional[str] = None
+
+    # Outbound HTTP (Open-Meteo) client pool.
+    http_timeout_seconds: float = 10.0
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry_seconds: float = 30.0
+    http_max_requests_per_host: int = 10
+    http2_enabled: bool = True
+
+    # Geocoding cache: in-process LRU in front of the persistent geocode_cache table.
+    geocode_cache_size: int = 2048
+    geocode_cache_ttl_seconds: int = 24 * 60 * 60
+    geocode_negative_ttl_seconds: int = 60 * 60
+
+    # Forecast cache: per-day entries keyed by coordinates rounded to a grid.
+    # Open-Meteo refreshes its forecast models roughly hourly.
+    forecast_cache_size: int = 50_000
+    forecast_cache_ttl_seconds: int = 60 * 60
+    forecast_grid_decimals: int = 2
+
+    # Batch weather-alert refresh for upcoming trips. An interval of 0 disables the in-process task.
+    weather_refresh_days_ahead: int = 14
+    weather_refresh_concurrency: int = 8
+    weather_refresh_interval_minutes: int = 0
+
+    # Bulk expense import: rows validated and inserted per committed batch, and the number of
+    # row errors echoed back in the response.
+    bulk_import_chunk_size: int = 1000
+    bulk_import_max_errors: int = 1000
+
+    # Exports: rows fetched per database round-trip, in-memory size before a rendered document
+    # spills to a temporary file, and response chunk size.
+    export_yield_per: int = 500
+    export_spool_max_bytes: int = 8 * 1024 * 1024
+    export_chunk_size: int = 64 * 1024
+
+    # Background export jobs: rendered artifacts are stored under export_dir keyed by a hash of
+    # the trip's content; job records are kept in memory for export_job_ttl_seconds.
+    export_dir: str = "exports"
+    export_process_workers: int = 2
+    export_job_cache_size: int = 10_000
+    export_job_ttl_seconds: int = 60 * 60
+    # Artifact cleanup: files unused for export_artifact_max_age_hours are deleted, then the least
+    # recently used ones until export_dir fits in export_dir_max_bytes. An interval of 0 disables it.
+    export_artifact_max_age_hours: int = 7 * 24
+    export_dir_max_bytes: int = 1024 * 1024 * 1024
+    export_cleanup_interval_minutes: int = 60
+
+    # Response cache for trip reads, keyed by (trip id, version, role). "redis" needs the redis
+    # package and response_cache_redis_url (e.g. redis://localhost:6379/0); "none" disables it.
+    response_cache_backend: Literal["memory", "redis", "none"] = "memory"
+    response_cache_size: int = 10_000
+    response_cache_ttl_seconds: int = 5 * 60
+    response_cache_redis_url: Optional[str] = None
+
     model_config = SettingsConfigDict(
         env_prefix="TRIP_PLANNER_",
         case_sensitive=False,
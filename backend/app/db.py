@@ -1,20 +1,186 @@
 """Database engine and session management."""
 
-from typing import Generator
+import asyncio
+import threading
+import time
+import weakref
+from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncGenerator, Callable, Dict, Generator, Optional, Type, TypeVar, Union
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
 
 from .config import get_settings
 
 settings = get_settings()
 
+
+
+class PoolMetrics:
+    """Counters fed by pool events plus checkout wait time measured around `Pool.connect`."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.connections_opened = 0
+        self.overflow_connections = 0
+        self.invalidations = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkout_wait_total += seconds
+            self.checkout_wait_max = max(self.checkout_wait_max, seconds)
+
+    def attach(self, target_engine: Engine) -> None:
+        @event.listens_for(target_engine, "connect")
+        def _on_connect(dbapi_connection, connection_record):
+            pool = target_engine.pool
+            with self._lock:
+                self.connections_opened += 1
+                # A connection opened while the pool is past pool_size is an overflow connection.
+                if isinstance(pool, QueuePool) and pool.overflow() > 0:
+                    self.overflow_connections += 1
+
+        @event.listens_for(target_engine, "checkout")
+        def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+            with self._lock:
+                self.checkouts += 1
+                self.in_use += 1
+                self.peak_in_use = max(self.peak_in_use, self.in_use)
+
+        @event.listens_for(target_engine, "checkin")
+        def _on_checkin(dbapi_connection, connection_record):
+            with self._lock:
+                self.in_use = max(0, self.in_use - 1)
+
+        @event.listens_for(target_engine, "invalidate")
+        def _on_invalidate(dbapi_connection, connection_record, exception):
+            with self._lock:
+                self.invalidations += 1
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pool": type(pool).__name__,
+                "status": pool.status(),
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "connections_opened": self.connections_opened,
+                "overflow_connections": self.overflow_connections,
+                "invalidations": self.invalidations,
+                "checkout_wait_avg_ms": round(self.checkout_wait_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+            }
+
+
+def _timed_pool_class(pool_cls: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """Subclass `pool_cls` so each checkout's wait (queueing, connecting, pre-ping) is recorded."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return pool_cls.connect(self)
+        finally:
+            metrics.record_wait(time.perf_counter() - started)
+
+    return type(f"Timed{pool_cls.__name__}", (pool_cls,), {"connect": connect})
+
+
+def _engine_options(url: str, queue_pool_cls: Type[Pool], metrics: PoolMetrics) -> Dict[str, Any]:
+    """Pool options from Settings. NullPool suits pgbouncer/Supabase transaction pooling."""
+    if url.startswith("sqlite"):
+        return {}
+    if settings.db_pool_class == "null":
+        return {"poolclass": _timed_pool_class(NullPool, metrics), "pool_pre_ping": settings.db_pool_pre_ping}
+    return {
+        "poolclass": _timed_pool_class(queue_pool_cls, metrics),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
 connect_args = {"check_same_thread": False} if settings.database_url.startswith("sqlite") else {}
 
-engine = create_engine(settings.database_url, connect_args=connect_args)
+pool_metrics = PoolMetrics()
+engine = create_engine(
+    settings.database_url,
+    connect_args=connect_args,
+    **_engine_options(settings.database_url, QueuePool, pool_metrics),
+)
+pool_metrics.attach(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Dedicated pool for blocking ORM work issued from async routes, so it never stalls the event loop
+# and does not compete with FastAPI's shared threadpool.
+db_executor = ThreadPoolExecutor(max_workers=settings.db_thread_pool_size, thread_name_prefix="db")
+
+T = TypeVar("T")
+
+
+def _async_database_url(url: str) -> str:
+    """Map the sync driver URL onto its asyncio driver (asyncpg / aiosqlite)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        query = dict(parsed.query)
+        # asyncpg spells libpq's sslmode as ssl.
+        if "sslmode" in query:
+            query["ssl"] = query.pop("sslmode")
+        return parsed.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return url
+
+
+async_engine = None
+AsyncSessionLocal = None
+async_pool_metrics = PoolMetrics()
+if settings.async_db_enabled:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = settings.async_database_url or _async_database_url(settings.database_url)
+    # pgbouncer (the Supabase pooler) cannot keep asyncpg's server-side prepared statements.
+    async_connect_args = {"statement_cache_size": 0} if async_url.startswith("postgresql+asyncpg") else {}
+    async_engine = create_async_engine(
+        async_url,
+        connect_args=async_connect_args,
+        **_engine_options(async_url, AsyncAdaptedQueuePool, async_pool_metrics),
+    )
+    async_pool_metrics.attach(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def dialect_insert(db: Session):
+    """Return the dialect `insert` construct that supports ON CONFLICT, or None if unsupported."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert
+
+
+def pool_stats() -> Dict[str, Any]:
+    stats = {"sync": pool_metrics.snapshot(engine.pool)}
+    if async_engine is not None:
+        stats["async"] = async_pool_metrics.snapshot(async_engine.sync_engine.pool)
+    return stats
+
 
 def get_db() -> Generator:
     """Provide a SQLAlchemy session for FastAPI dependency injection."""
@@ -23,3 +189,84 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+async def run_db(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a synchronous database callable on the DB thread pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(db_executor, partial(fn, *args, **kwargs))
+
+
+def _pool_capacity(pool: Pool) -> Optional[int]:
+    """Most connections the pool hands out at once, or None when it is unbounded."""
+    # QueuePool has no public accessor for max_overflow; -1 means unlimited overflow.
+    if isinstance(pool, QueuePool) and pool._max_overflow >= 0:
+        return pool.size() + pool._max_overflow
+    return None
+
+
+# One semaphore per event loop, since asyncio primitives are bound to the loop they run on.
+_session_slots_by_loop: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _session_slots() -> Optional[asyncio.Semaphore]:
+    capacity = _pool_capacity(engine.pool)
+    if capacity is None:
+        return None
+    loop = asyncio.get_running_loop()
+    slots = _session_slots_by_loop.get(loop)
+    if slots is None:
+        slots = _session_slots_by_loop[loop] = asyncio.Semaphore(capacity)
+    return slots
+
+
+async def get_async_db() -> AsyncGenerator:
+    """Provide a session for async routes.
+
+    Yields an `AsyncSession` when `async_db_enabled` is set, otherwise a sync `Session`;
+    route code stays the same either way by going through `run_session`.
+
+    A sync session keeps its connection until it is closed on the DB thread pool. Waiting for a
+    free connection would block a DB thread, and with every connection held by requests queued
+    for those threads the pool would deadlock until `pool_timeout`. Sessions therefore wait for
+    one of the pool's slots on the event loop instead.
+    """
+    if AsyncSessionLocal is None:
+        slots = _session_slots()
+        if slots is not None:
+            await slots.acquire()
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            try:
+                await run_db(db.close)
+            finally:
+                if slots is not None:
+                    slots.release()
+        return
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# A separate session for concurrent work inside one request, since a session must not be shared
+# between tasks running at the same time.
+open_async_db = asynccontextmanager(get_async_db)
+
+
+async def run_session(db: Union[Session, Any], fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Call `fn(sync_session, *args)` without blocking the event loop.
+
+    With an `AsyncSession` the sync ORM code (lazy loads included) runs on the async driver via
+    `run_sync`; with a plain `Session` it runs on the DB thread pool.
+    """
+    if isinstance(db, Session):
+        return await run_db(fn, db, *args, **kwargs)
+    return await db.run_sync(fn, *args, **kwargs)
+
+
+async def dispose_async_engine() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
@@ -1,12 +1,45 @@
 """FastAPI application entrypoint."""
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
+
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routers import auth, budget, destinations, events, trips, weather
+from .config import get_settings
+from .db import dispose_async_engine
+from .routers import auth, budget, destinations, events, exports, metrics, overview, trips, weather
 from .schemas import HealthResponse
+from .services.export_jobs import run_periodic_cleanup, shutdown_export_jobs
+from .services.http_client import close_http_client, start_http_client
+from .services.weather_refresh import run_periodic_refresh
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled keep-alive client serves every Open-Meteo call for the app's lifetime.
+    settings = get_settings()
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+    await start_http_client()
+    background_tasks = []
+    if settings.weather_refresh_interval_minutes > 0:
+        background_tasks.append(asyncio.create_task(run_periodic_refresh(settings.weather_refresh_interval_minutes)))
+    if settings.export_cleanup_interval_minutes > 0:
+        background_tasks.append(asyncio.create_task(run_periodic_cleanup(settings.export_cleanup_interval_minutes)))
+    try:
+        yield
+    finally:
+        for task in background_tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await shutdown_export_jobs()
+        await close_http_client()
+        await dispose_async_engine()
+
 
-app = FastAPI(title="Trip Itinerary Planner")
+app = FastAPI(title="Trip Itinerary Planner", lifespan=lifespan)
 
 origins = [
     "http://localhost:5173",
@@ -22,6 +55,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 @app.get("/health", response_model=HealthResponse, tags=["health"])
@@ -38,7 +72,10 @@ def root():
 # Register routers (implementations will be added incrementally).
 app.include_router(auth.router, prefix="/auth")
 app.include_router(trips.router)
+app.include_router(overview.router)
 app.include_router(destinations.router)
 app.include_router(events.router)
 app.include_router(budget.router)
 app.include_router(weather.router)
+app.include_router(exports.router)
+app.include_router(metrics.router)
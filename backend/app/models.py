@@ -1,6 +1,8 @@
 """SQLAlchemy models for the trip planner domain."""
 
-from sqlalchemy import Column, Date, Float, ForeignKey, Integer, JSON, String, Text, Time
+from datetime import datetime
+
+from sqlalchemy import Column, Date, DateTime, Float, ForeignKey, Index, Integer, JSON, String, Text, Time, UniqueConstraint
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -20,6 +22,7 @@ class User(Base):
 
 class Trip(Base):
     __tablename__ = "trips"
+    __table_args__ = (Index("ix_trips_owner_id_start_date_id", "owner_id", "start_date", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -27,6 +30,8 @@ class Trip(Base):
     destination = Column(String, nullable=False)
     start_date = Column(Date, nullable=False)
     end_date = Column(Date, nullable=False)
+    # Incremented by every mutation of the trip or its children; drives ETags.
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     owner = relationship("User", back_populates="trips_owned")
     members = relationship("TripMember", back_populates="trip", cascade="all, delete-orphan")
@@ -35,10 +40,15 @@ class Trip(Base):
     budget_envelopes = relationship("BudgetEnvelope", back_populates="trip", cascade="all, delete-orphan")
     expenses = relationship("Expense", back_populates="trip", cascade="all, delete-orphan")
     weather_alerts = relationship("WeatherAlert", back_populates="trip", cascade="all, delete-orphan")
+    budget_rollups = relationship("BudgetRollup", back_populates="trip", cascade="all, delete-orphan")
 
 
 class TripMember(Base):
     __tablename__ = "trip_members"
+    __table_args__ = (
+        Index("ix_trip_members_trip_id_user_id", "trip_id", "user_id"),
+        Index("ix_trip_members_user_id_trip_id", "user_id", "trip_id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False, index=True)
@@ -77,6 +87,7 @@ class TripDestination(Base):
 
 class Event(Base):
     __tablename__ = "events"
+    __table_args__ = (Index("ix_events_trip_id_date_start_time", "trip_id", "date", "start_time", "id"),)
 
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False, index=True)
@@ -123,8 +134,26 @@ class Expense(Base):
     event = relationship("Event", back_populates="expenses")
 
 
+class BudgetRollup(Base):
+    """Per-trip, per-category budget totals maintained incrementally by the budget routes."""
+
+    __tablename__ = "budget_rollups"
+    __table_args__ = (UniqueConstraint("trip_id", "category", name="uq_budget_rollups_trip_id_category"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False, index=True)
+    category = Column(String, nullable=False)
+    planned_total = Column(Float, nullable=False, default=0.0)
+    actual_total = Column(Float, nullable=False, default=0.0)
+    envelope_count = Column(Integer, nullable=False, default=0)
+    expense_count = Column(Integer, nullable=False, default=0)
+
+    trip = relationship("Trip", back_populates="budget_rollups")
+
+
 class WeatherAlert(Base):
     __tablename__ = "weather_alerts"
+    __table_args__ = (UniqueConstraint("trip_id", "date", name="uq_weather_alerts_trip_id_date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     trip_id = Column(Integer, ForeignKey("trips.id"), nullable=False, index=True)
@@ -134,3 +163,15 @@ class WeatherAlert(Base):
     provider_payload = Column(JSON, nullable=True)
 
     trip = relationship("Trip", back_populates="weather_alerts")
+
+
+class GeocodeEntry(Base):
+    """Persistent geocoding result for a normalized place query; null coordinates record a miss."""
+
+    __tablename__ = "geocode_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    query = Column(String, unique=True, nullable=False, index=True)
+    latitude = Column(Float, nullable=True)
+    longitude = Column(Float, nullable=True)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,170 @@
+"""Shared trip authorization dependencies used by every trip-scoped router."""
+
+from dataclasses import dataclass
+from typing import Dict, Generic, Optional, Type, TypeVar
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from app.db import get_async_db, get_db, run_session
+from app.models import BudgetEnvelope, Event, Expense, Trip, TripMember
+from app.routers.auth import get_current_user
+
+EDIT_ROLES = {"owner", "editor"}
+
+T = TypeVar("T")
+
+
+@dataclass
+class TripAccess:
+    trip: Trip
+    role: str
+    # Set from trip.owner_id, never from the role string: a membership row cannot grant ownership.
+    is_owner: bool = False
+
+    @property
+    def can_edit(self) -> bool:
+        return self.role in EDIT_ROLES
+
+
+@dataclass
+class EntityAccess(Generic[T]):
+    """A trip-owned row together with the caller's access to its trip."""
+
+    entity: T
+    access: TripAccess
+
+
+def _resolve_access(trip: Trip, member_role: Optional[str], user_id: int) -> TripAccess:
+    is_owner = trip.owner_id == user_id
+    role = "owner" if is_owner else member_role
+    if not role:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this trip")
+    return TripAccess(trip=trip, role=role, is_owner=is_owner)
+
+
+def _request_cache(request: Request) -> Dict[int, TripAccess]:
+    cache: Optional[Dict[int, TripAccess]] = getattr(request.state, "trip_access", None)
+    if cache is None:
+        cache = request.state.trip_access = {}
+    return cache
+
+
+def load_trip_access(db: Session, trip_id: int, user_id: int) -> TripAccess:
+    """Resolve the trip and the caller's role with one query (trip LEFT JOIN the caller's membership)."""
+    row = (
+        db.query(Trip, TripMember.role)
+        .outerjoin(TripMember, and_(TripMember.trip_id == Trip.id, TripMember.user_id == user_id))
+        .filter(Trip.id == trip_id)
+        .first()
+    )
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
+    trip, member_role = row
+    return _resolve_access(trip, member_role, user_id)
+
+
+def load_entity_access(
+    db: Session, model: Type[T], entity_id: int, user_id: int, not_found: str, for_update: bool = False
+) -> EntityAccess[T]:
+    """Fetch a trip-owned row, its trip and the caller's role in one joined query.
+
+    With `for_update` the row itself is locked (`SELECT ... FOR UPDATE OF`) and re-read, so a
+    mutation computing deltas from its old values cannot interleave with another one.
+    """
+    query = (
+        db.query(model, Trip, TripMember.role)
+        .join(Trip, Trip.id == model.trip_id)
+        .outerjoin(TripMember, and_(TripMember.trip_id == Trip.id, TripMember.user_id == user_id))
+        .filter(model.id == entity_id)
+    )
+    if for_update:
+        query = query.with_for_update(of=model).populate_existing()
+    row = query.first()
+    if row is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=not_found)
+    entity, trip, member_role = row
+    return EntityAccess(entity=entity, access=_resolve_access(trip, member_role, user_id))
+
+
+def require_edit(access: TripAccess) -> TripAccess:
+    if not access.can_edit:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only owner or editor can modify this trip")
+    return access
+
+
+def require_owner(access: TripAccess) -> TripAccess:
+    if not access.is_owner:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only owner can perform this action")
+    return access
+
+
+def get_trip_access(
+    trip_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user=Depends(get_current_user),
+) -> TripAccess:
+    """Trip + role for the path's trip_id, memoised on the request so it is resolved at most once."""
+    cache = _request_cache(request)
+    access = cache.get(trip_id)
+    if access is None:
+        access = load_trip_access(db, trip_id, current_user.id)
+        cache[trip_id] = access
+    return access
+
+
+async def get_async_trip_access(
+    trip_id: int,
+    request: Request,
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user),
+) -> TripAccess:
+    """`get_trip_access` for async routes; the lookup runs on the route's `get_async_db` session."""
+    cache = _request_cache(request)
+    access = cache.get(trip_id)
+    if access is None:
+        access = await run_session(db, load_trip_access, trip_id, current_user.id)
+        cache[trip_id] = access
+    return access
+
+
+def trip_viewer(access: TripAccess = Depends(get_trip_access)) -> TripAccess:
+    return access
+
+
+def trip_editor(access: TripAccess = Depends(get_trip_access)) -> TripAccess:
+    return require_edit(access)
+
+
+def trip_owner(access: TripAccess = Depends(get_trip_access)) -> TripAccess:
+    return require_owner(access)
+
+
+def _entity_with_access(
+    request: Request, db: Session, model: Type[T], entity_id: int, user_id: int, not_found: str, for_update: bool = False
+) -> EntityAccess[T]:
+    loaded = load_entity_access(db, model, entity_id, user_id, not_found, for_update=for_update)
+    # Share the resolved role with any later trip-scoped lookup in the same request.
+    _request_cache(request).setdefault(loaded.access.trip.id, loaded.access)
+    return loaded
+
+
+# The entity dependencies back the PATCH/DELETE routes, so they lock the row until commit.
+def event_with_access(
+    event_id: int, request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user)
+) -> EntityAccess[Event]:
+    return _entity_with_access(request, db, Event, event_id, current_user.id, "Event not found", for_update=True)
+
+
+def envelope_with_access(
+    envelope_id: int, request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user)
+) -> EntityAccess[BudgetEnvelope]:
+    return _entity_with_access(request, db, BudgetEnvelope, envelope_id, current_user.id, "Budget envelope not found", for_update=True)
+
+
+def expense_with_access(
+    expense_id: int, request: Request, db: Session = Depends(get_db), current_user=Depends(get_current_user)
+) -> EntityAccess[Expense]:
+    return _entity_with_access(request, db, Expense, expense_id, current_user.id, "Expense not found", for_update=True)
@@ -1,19 +1,22 @@
 """Authentication endpoints and JWT utilities."""
 
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy import or_
+from sqlalchemy import event, or_
 from sqlalchemy.orm import Session
 
 from app.config import get_settings
-from app.db import get_db
+from app.db import get_async_db, get_db, run_session
 from app.models import User
 from app.schemas import UserCreate, UserLogin, UserRead
+from app.services.password_hasher import PasswordHasher, PasswordHasherBusy
+from app.services.ttl_cache import MISSING, TTLCache
 
 settings = get_settings()
 SECRET_KEY = getattr(settings, "secret_key", "change-me-in-production")
@@ -21,11 +24,50 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = getattr(settings, "access_token_expire_minutes", 60 * 24)
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
+password_hasher = PasswordHasher(
+    pwd_context,
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 router = APIRouter(tags=["auth"])
 
+# Bearer token -> user id, so repeated requests with the same token skip JWT verification.
+# Entries never outlive the token's own expiry.
+_token_cache = TTLCache(maxsize=settings.auth_cache_size, ttl_seconds=settings.auth_token_cache_ttl_seconds)
+# User id -> detached User row; invalidated whenever the row is updated or deleted.
+_user_cache = TTLCache(maxsize=settings.auth_cache_size, ttl_seconds=settings.auth_user_cache_ttl_seconds)
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    _user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user_on_change(mapper, connection, target: User) -> None:
+    invalidate_cached_user(target.id)
+
+
+def auth_cache_stats() -> Dict[str, object]:
+    return {"tokens": _token_cache.stats(), "users": _user_cache.stats(), "password_hasher": password_hasher.stats()}
+
+
+def _hasher_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, please retry shortly.",
+        headers={"Retry-After": "1"},
+    )
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -51,14 +93,15 @@ def get_user_by_identifier(db: Session, identifier: str) -> Optional[User]:
     )
 
 
-@router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register_user(payload: UserCreate, db: Session = Depends(get_db)) -> User:
+def _ensure_user_available(db: Session, payload: UserCreate) -> None:
     # Ensure email and username are unique.
     existing = db.query(User).filter(or_(User.email == payload.email, User.username == payload.username)).first()
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="User with that email or username already exists.")
 
-    hashed_password = get_password_hash(payload.password)
+
+def _create_user(db: Session, payload: UserCreate, hashed_password: str) -> User:
+    _ensure_user_available(db, payload)
     user = User(email=payload.email, username=payload.username, password_hash=hashed_password)
     db.add(user)
     db.commit()
@@ -66,35 +109,82 @@ def register_user(payload: UserCreate, db: Session = Depends(get_db)) -> User:
     return user
 
 
+def _update_password_hash(db: Session, user: User, password_hash: str) -> None:
+    user.password_hash = password_hash
+    db.commit()
+    db.refresh(user)
+
+
+@router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
+async def register_user(payload: UserCreate, db=Depends(get_async_db)) -> User:
+    await run_session(db, _ensure_user_available, payload)
+    try:
+        hashed_password = await password_hasher.hash(payload.password)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    return await run_session(db, _create_user, payload, hashed_password)
+
+
 @router.post("/login")
-def login(payload: UserLogin, db: Session = Depends(get_db)):
+async def login(payload: UserLogin, db=Depends(get_async_db)):
     identifier = payload.email or payload.username
     if not identifier:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email or username is required.")
 
-    user = get_user_by_identifier(db, identifier)
-    if not user or not verify_password(payload.password, user.password_hash):
+    user = await run_session(db, get_user_by_identifier, identifier)
+    if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    try:
+        valid, new_hash = await password_hasher.verify_and_update(payload.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise _hasher_busy()
+    if not valid:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if new_hash:
+        # Cost settings changed since this hash was created; upgrade it transparently.
+        await run_session(db, _update_password_hash, user, new_hash)
 
     access_token = create_access_token({"sub": str(user.id)})
     return {"access_token": access_token, "token_type": "bearer", "user": UserRead.model_validate(user)}
 
 
+def _decode_user_id(token: str) -> Optional[int]:
+    cached = _token_cache.get(token)
+    if cached is not MISSING:
+        return cached
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
+    user_id: Optional[str] = payload.get("sub")
+    if user_id is None:
+        return None
+    ttl = settings.auth_token_cache_ttl_seconds
+    if payload.get("exp") is not None:
+        ttl = min(ttl, payload["exp"] - time.time())
+    if ttl > 0:
+        _token_cache.set(token, int(user_id), ttl_seconds=ttl)
+    return int(user_id)
+
+
 def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: Optional[str] = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+    user_id = _decode_user_id(token)
+    if user_id is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = _user_cache.get(user_id)
+    if user is not MISSING:
+        return user
+
+    user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise credentials_exception
+    # Detach so the cached instance is shared read-only across requests and sessions.
+    db.expunge(user)
+    _user_cache.set(user_id, user)
     return user
@@ -1,48 +1,41 @@
 """Budget endpoints."""
 
-from collections import defaultdict
 from datetime import date
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from pydantic import BaseModel
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.models import BudgetEnvelope, Expense, Trip
+from app.config import get_settings
+from app.db import get_async_db, get_db, run_session
+from app.models import BudgetEnvelope, BudgetRollup, Expense
+from app.routers.access import (
+    EntityAccess,
+    TripAccess,
+    envelope_with_access,
+    expense_with_access,
+    load_trip_access,
+    require_edit,
+    trip_editor,
+)
+from app.routers.conditional import cached_trip_read, conditional_trip_read
 from app.routers.auth import get_current_user
+from app.routers.pagination import cursor_int, decode_typed_cursor, encode_cursor, set_next_cursor
 from app.schemas import BudgetEnvelopeCreate, BudgetEnvelopeRead, ExpenseCreate, ExpenseRead
+from app.services.budget_rollups import (
+    UNCATEGORIZED,
+    apply_rollup_delta,
+    expense_category,
+    move_envelope_expenses,
+)
+from app.services.expense_import import ImportFormatError, format_for_content_type, import_expenses
+from app.services.trip_version import bump_trip_version
 
 router = APIRouter(tags=["budget"])
 
 
-def _get_trip(db: Session, trip_id: int) -> Trip:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    return trip
-
-
-def _user_role_for_trip(trip: Trip, user_id: int):
-    if trip.owner_id == user_id:
-        return "owner"
-    membership = next((m for m in trip.members if m.user_id == user_id), None)
-    return membership.role if membership else None
-
-
-def _require_view_access(trip: Trip, user_id: int) -> str:
-    role = _user_role_for_trip(trip, user_id)
-    if not role:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this trip")
-    return role
-
-
-def _require_edit_access(trip: Trip, user_id: int) -> None:
-    role = _require_view_access(trip, user_id)
-    if role not in {"owner", "editor"}:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only owner or editor can modify budgets/expenses")
-
-
 class BudgetEnvelopeUpdate(BaseModel):
     category: Optional[str] = None
     planned_amount: Optional[float] = None
@@ -60,139 +53,222 @@ class ExpenseUpdate(BaseModel):
     spent_at_date: Optional[date] = None
 
 
-@router.get("/trips/{trip_id}/budget")
-def budget_summary(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip(db, trip_id)
-    _require_view_access(trip, current_user.id)
-
+def _budget_summary(
+    db: Session, trip_id: int, include_expenses: bool, expense_limit: Optional[int], after: Optional[tuple]
+) -> Tuple[Dict[str, Any], Optional[str]]:
+    """The budget summary and the next expense page's cursor, if there is one."""
+    next_cursor = None
     envelopes = db.query(BudgetEnvelope).filter(BudgetEnvelope.trip_id == trip_id).all()
-    expenses = db.query(Expense).filter(Expense.trip_id == trip_id).all()
 
-    category_planned: Dict[str, float] = defaultdict(float)
-    category_actual: Dict[str, float] = defaultdict(float)
-
-    for env in envelopes:
-        category_planned[env.category] += env.planned_amount
-
-    for exp in expenses:
-        if exp.envelope:
-            category_actual[exp.envelope.category] += exp.amount
+    rollups = (
+        db.query(BudgetRollup)
+        .filter(
+            BudgetRollup.trip_id == trip_id,
+            or_(BudgetRollup.envelope_count > 0, BudgetRollup.expense_count > 0),
+        )
+        .all()
+    )
+
+    expenses: List[Expense] = []
+    if include_expenses:
+        query = db.query(Expense).filter(Expense.trip_id == trip_id)
+        if after:
+            query = query.filter(Expense.id > after[0])
+        query = query.order_by(Expense.id)
+        if expense_limit is None:
+            expenses = query.all()
         else:
-            category_actual["uncategorized"] += exp.amount
+            expenses = query.limit(expense_limit + 1).all()
+            if len(expenses) > expense_limit:
+                expenses = expenses[:expense_limit]
+                next_cursor = encode_cursor(expenses[-1].id)
 
-    planned_total_all = sum(category_planned.values())
-    actual_total_all = sum(category_actual.values())
+    planned_total_all = sum(r.planned_total for r in rollups)
+    actual_total_all = sum(r.actual_total for r in rollups)
 
-    return {
+    summary = {
         "envelopes": [BudgetEnvelopeRead.model_validate(e) for e in envelopes],
         "expenses": [ExpenseRead.model_validate(e) for e in expenses],
         "categories": {
-            cat: {"planned_total": category_planned.get(cat, 0.0), "actual_total": category_actual.get(cat, 0.0)}
-            for cat in set(category_planned.keys()).union(set(category_actual.keys()))
+            r.category: {"planned_total": r.planned_total, "actual_total": r.actual_total} for r in rollups
         },
         "totals": {"planned_total_all": planned_total_all, "actual_total_all": actual_total_all},
     }
+    return summary, next_cursor
 
 
-@router.post("/trips/{trip_id}/envelopes", response_model=BudgetEnvelopeRead, status_code=status.HTTP_201_CREATED)
-def create_envelope(trip_id: int, payload: BudgetEnvelopeCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip(db, trip_id)
-    _require_edit_access(trip, current_user.id)
+@router.get("/trips/{trip_id}/budget")
+@cached_trip_read("budget")
+async def budget_summary(
+    trip_id: int,
+    request: Request,
+    response: Response,
+    include_expenses: bool = Query(default=True),
+    expense_limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    expense_cursor: Optional[str] = Query(default=None),
+    db=Depends(get_async_db),
+    access: TripAccess = Depends(conditional_trip_read("budget")),
+):
+    """Per-category planned/actual totals read from the budget rollups, plus the trip's envelopes.
+
+    The expense list is optional; with `expense_limit` it is paged by id and the next page's
+    cursor is returned in the `X-Next-Cursor` header.
+    """
+    after = decode_typed_cursor(expense_cursor, cursor_int)
+    summary, next_cursor = await run_session(db, _budget_summary, trip_id, include_expenses, expense_limit, after)
+    set_next_cursor(response, next_cursor)
+    return summary
+
 
+@router.post("/trips/{trip_id}/envelopes", response_model=BudgetEnvelopeRead, status_code=status.HTTP_201_CREATED)
+def create_envelope(trip_id: int, payload: BudgetEnvelopeCreate, db: Session = Depends(get_db), access: TripAccess = Depends(trip_editor)):
     if payload.trip_id != trip_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Trip ID mismatch")
 
-    env = BudgetEnvelope(**payload.model_dump())
+    # `notes` is accepted by the schema but has no column on the envelope.
+    env = BudgetEnvelope(**payload.model_dump(exclude={"notes"}))
     db.add(env)
+    apply_rollup_delta(db, trip_id, env.category, planned=env.planned_amount, envelopes=1)
+    bump_trip_version(db, trip_id)
     db.commit()
     db.refresh(env)
     return env
 
 
-def _get_envelope_or_404(db: Session, envelope_id: int) -> BudgetEnvelope:
-    env = db.query(BudgetEnvelope).filter(BudgetEnvelope.id == envelope_id).first()
-    if not env:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget envelope not found")
-    return env
-
-
 @router.patch("/envelopes/{envelope_id}", response_model=BudgetEnvelopeRead)
-def update_envelope(envelope_id: int, payload: BudgetEnvelopeUpdate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    env = _get_envelope_or_404(db, envelope_id)
-    trip = _get_trip(db, env.trip_id)
-    _require_edit_access(trip, current_user.id)
+def update_envelope(
+    payload: BudgetEnvelopeUpdate,
+    db: Session = Depends(get_db),
+    loaded: EntityAccess[BudgetEnvelope] = Depends(envelope_with_access),
+):
+    require_edit(loaded.access)
+    env = loaded.entity
 
     if payload.trip_id and payload.trip_id != env.trip_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot move envelope to another trip")
 
-    for field, value in payload.model_dump(exclude_unset=True).items():
+    old_category, old_planned = env.category, env.planned_amount
+    for field, value in payload.model_dump(exclude_unset=True, exclude={"notes"}).items():
         if field == "trip_id":
             continue
         setattr(env, field, value)
 
+    if env.category != old_category:
+        apply_rollup_delta(db, env.trip_id, old_category, planned=-old_planned, envelopes=-1)
+        apply_rollup_delta(db, env.trip_id, env.category, planned=env.planned_amount, envelopes=1)
+        move_envelope_expenses(db, env, old_category, env.category)
+    else:
+        apply_rollup_delta(db, env.trip_id, env.category, planned=env.planned_amount - old_planned)
+
+    bump_trip_version(db, env.trip_id)
     db.commit()
     db.refresh(env)
     return env
 
 
 @router.delete("/envelopes/{envelope_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_envelope(envelope_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    env = _get_envelope_or_404(db, envelope_id)
-    trip = _get_trip(db, env.trip_id)
-    _require_edit_access(trip, current_user.id)
-
+def delete_envelope(db: Session = Depends(get_db), loaded: EntityAccess[BudgetEnvelope] = Depends(envelope_with_access)):
+    require_edit(loaded.access)
+    env = loaded.entity
+
+    # Its expenses are kept with envelope_id cleared, so they move to "uncategorized".
+    apply_rollup_delta(db, env.trip_id, env.category, planned=-env.planned_amount, envelopes=-1)
+    move_envelope_expenses(db, env, env.category, UNCATEGORIZED)
+    bump_trip_version(db, env.trip_id)
     db.delete(env)
     db.commit()
     return None
 
 
 @router.post("/trips/{trip_id}/expenses", response_model=ExpenseRead, status_code=status.HTTP_201_CREATED)
-def create_expense(trip_id: int, payload: ExpenseCreate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip(db, trip_id)
-    _require_edit_access(trip, current_user.id)
-
+def create_expense(trip_id: int, payload: ExpenseCreate, db: Session = Depends(get_db), access: TripAccess = Depends(trip_editor)):
     if payload.trip_id != trip_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Trip ID mismatch")
 
     expense = Expense(**payload.model_dump())
     db.add(expense)
+    apply_rollup_delta(db, trip_id, expense_category(db, expense.envelope_id), actual=expense.amount, expenses=1)
+    bump_trip_version(db, trip_id)
     db.commit()
     db.refresh(expense)
     return expense
 
 
-def _get_expense_or_404(db: Session, expense_id: int) -> Expense:
-    expense = db.query(Expense).filter(Expense.id == expense_id).first()
-    if not expense:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Expense not found")
-    return expense
+@router.post("/trips/{trip_id}/expenses:bulk")
+async def bulk_import_expenses(
+    trip_id: int,
+    request: Request,
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """Import many expenses from a streamed `text/csv` or `application/x-ndjson` body.
+
+    CSV needs a header row naming `ExpenseCreate` fields; `trip_id` may be omitted. Valid rows
+    are inserted in committed batches; invalid ones are reported by line number.
+    """
+    access = await run_session(db, load_trip_access, trip_id, current_user.id)
+    require_edit(access)
+
+    fmt = format_for_content_type(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Expected text/csv or application/x-ndjson",
+        )
+
+    settings = get_settings()
+    try:
+        result = await import_expenses(
+            db,
+            trip_id,
+            request.stream(),
+            fmt,
+            chunk_size=settings.bulk_import_chunk_size,
+            max_errors=settings.bulk_import_max_errors,
+        )
+    except ImportFormatError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    return result
 
 
 @router.patch("/expenses/{expense_id}", response_model=ExpenseRead)
-def update_expense(expense_id: int, payload: ExpenseUpdate, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    expense = _get_expense_or_404(db, expense_id)
-    trip = _get_trip(db, expense.trip_id)
-    _require_edit_access(trip, current_user.id)
+def update_expense(
+    payload: ExpenseUpdate,
+    db: Session = Depends(get_db),
+    loaded: EntityAccess[Expense] = Depends(expense_with_access),
+):
+    require_edit(loaded.access)
+    expense = loaded.entity
 
     if payload.trip_id and payload.trip_id != expense.trip_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cannot move expense to another trip")
 
+    old_category, old_amount = expense_category(db, expense.envelope_id), expense.amount
     for field, value in payload.model_dump(exclude_unset=True).items():
         if field == "trip_id":
             continue
         setattr(expense, field, value)
 
+    new_category = expense_category(db, expense.envelope_id)
+    if new_category != old_category:
+        apply_rollup_delta(db, expense.trip_id, old_category, actual=-old_amount, expenses=-1)
+        apply_rollup_delta(db, expense.trip_id, new_category, actual=expense.amount, expenses=1)
+    else:
+        apply_rollup_delta(db, expense.trip_id, new_category, actual=expense.amount - old_amount)
+
+    bump_trip_version(db, expense.trip_id)
     db.commit()
     db.refresh(expense)
     return expense
 
 
 @router.delete("/expenses/{expense_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_expense(expense_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    expense = _get_expense_or_404(db, expense_id)
-    trip = _get_trip(db, expense.trip_id)
-    _require_edit_access(trip, current_user.id)
+def delete_expense(db: Session = Depends(get_db), loaded: EntityAccess[Expense] = Depends(expense_with_access)):
+    require_edit(loaded.access)
+    expense = loaded.entity
 
+    apply_rollup_delta(db, expense.trip_id, expense_category(db, expense.envelope_id), actual=-expense.amount, expenses=-1)
+    bump_trip_version(db, expense.trip_id)
     db.delete(expense)
     db.commit()
     return None
@@ -0,0 +1,113 @@
+"""Conditional GET and response caching for trip-scoped reads, keyed on the trip's version counter."""
+
+import inspect
+from functools import wraps
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+
+from app.routers.access import TripAccess, get_async_trip_access
+from app.routers.pagination import NEXT_CURSOR_HEADER
+from app.services import response_cache
+
+# Clients may reuse a cached copy only after revalidating it.
+CACHE_CONTROL = "private, no-cache"
+
+# Headers a route sets on its injected Response that belong to the cached body.
+_CACHED_HEADERS = {NEXT_CURSOR_HEADER.lower()}
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 requires for If-None-Match.
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def trip_etag(access: TripAccess, resource: str) -> str:
+    return f'W/"trip-{access.trip.id}-v{access.trip.version}-{resource}"'
+
+
+def conditional_trip_read(resource: str) -> Callable[..., TripAccess]:
+    """`trip_viewer` plus ETag handling for a GET under the trip.
+
+    Answers 304 when `If-None-Match` matches the trip's current version, before the route body
+    (and its queries) runs; otherwise sets the ETag on the response. The trip is resolved on the
+    request's `get_async_db` session, which async routes share.
+    """
+
+    async def dependency(
+        request: Request, response: Response, access: TripAccess = Depends(get_async_trip_access)
+    ) -> TripAccess:
+        etag = trip_etag(access, resource)
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+        return access
+
+    return dependency
+
+
+def response_cache_key(resource: str, access: TripAccess, request: Request) -> str:
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    return f"{resource}:{access.trip.id}:v{access.trip.version}:{access.role}:{request.url.path}?{query}"
+
+
+def cached_trip_read(resource: str, response_type: Any = Any) -> Callable:
+    """Serve a trip GET from the response cache, filling it on a miss.
+
+    The route must take `request`, `response` and `access` (from `conditional_trip_read`)
+    parameters and may be sync or async. Its result is serialised as `response_type` (what would
+    otherwise be the route's `response_model`) and returned as a ready JSON response, together
+    with the headers set on the injected `response`.
+    """
+    adapter = TypeAdapter(response_type)
+
+    def lookup(kwargs) -> Tuple[str, Optional[response_cache.CachedResponse]]:
+        key = response_cache_key(resource, kwargs["access"], kwargs["request"])
+        return key, response_cache.get(resource, key)
+
+    def store(kwargs, key: str, result: Any) -> response_cache.CachedResponse:
+        body = adapter.dump_json(adapter.validate_python(result, from_attributes=True))
+        headers = {k: v for k, v in kwargs["response"].headers.items() if k.lower() in _CACHED_HEADERS}
+        cached = response_cache.CachedResponse(body=body, headers=headers)
+        response_cache.put(kwargs["access"].trip.id, key, cached)
+        return cached
+
+    def respond(kwargs, cached: response_cache.CachedResponse) -> Response:
+        out = Response(content=cached.body, media_type="application/json", headers=cached.headers)
+        for name, value in kwargs["response"].headers.items():
+            if name.lower() not in ("content-length", "content-type"):
+                out.headers[name] = value
+        return out
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+
+            @wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                offload = response_cache.blocking()
+                key, cached = await run_in_threadpool(lookup, kwargs) if offload else lookup(kwargs)
+                if cached is None:
+                    result = await fn(*args, **kwargs)
+                    cached = await run_in_threadpool(store, kwargs, key, result) if offload else store(kwargs, key, result)
+                return respond(kwargs, cached)
+
+            return async_wrapper
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            key, cached = lookup(kwargs)
+            if cached is None:
+                cached = store(kwargs, key, fn(*args, **kwargs))
+            return respond(kwargs, cached)
+
+        return wrapper
+
+    return decorator
@@ -1,45 +1,20 @@
 """Trip destinations and locations management."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
-from app.db import get_db
-from app.models import Trip, TripDestination, Location
-from app.routers.auth import get_current_user
+from app.db import get_async_db, get_db, run_session
+from app.models import TripDestination, Location
+from app.routers.access import TripAccess, trip_editor
+from app.routers.conditional import cached_trip_read, conditional_trip_read
 from app.schemas import LocationCreate, LocationRead, TripDestinationRead
+from app.services.trip_version import bump_trip_version
 
 router = APIRouter(prefix="/trips", tags=["destinations"])
 
 
-def _get_trip(db: Session, trip_id: int) -> Trip:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    return trip
-
-
-def _require_owner_or_member(trip: Trip, user_id: int) -> None:
-    if trip.owner_id == user_id:
-        return
-    if any(m.user_id == user_id for m in trip.members):
-        return
-    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this trip")
-
-
-def _require_owner_or_editor(trip: Trip, user_id: int) -> None:
-    if trip.owner_id == user_id:
-        return
-    member = next((m for m in trip.members if m.user_id == user_id), None)
-    if member and member.role in {"owner", "editor"}:
-        return
-    raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only owners or editors can modify destinations")
-
-
-@router.get("/{trip_id}/destinations")
-def list_destinations(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip(db, trip_id)
-    _require_owner_or_member(trip, current_user.id)
+def _trip_destinations(db: Session, trip_id: int) -> list:
     destinations = (
         db.query(TripDestination)
         .options(joinedload(TripDestination.location))
@@ -58,16 +33,25 @@ def list_destinations(trip_id: int, db: Session = Depends(get_db), current_user=
     ]
 
 
+@router.get("/{trip_id}/destinations")
+@cached_trip_read("destinations")
+async def list_destinations(
+    trip_id: int,
+    request: Request,
+    response: Response,
+    db=Depends(get_async_db),
+    access: TripAccess = Depends(conditional_trip_read("destinations")),
+):
+    return await run_session(db, _trip_destinations, trip_id)
+
+
 @router.post("/{trip_id}/destinations", status_code=status.HTTP_201_CREATED)
 def add_destination(
     trip_id: int,
     payload: LocationCreate,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    access: TripAccess = Depends(trip_editor),
 ):
-    trip = _get_trip(db, trip_id)
-    _require_owner_or_editor(trip, current_user.id)
-
     location = Location(name=payload.name, type=payload.type, address=payload.address)
     db.add(location)
     db.commit()
@@ -76,6 +60,7 @@ def add_destination(
     max_order = db.query(func.coalesce(func.max(TripDestination.sort_order), 0)).filter(TripDestination.trip_id == trip_id).scalar()
     dest = TripDestination(trip_id=trip_id, location_id=location.id, sort_order=max_order + 1)
     db.add(dest)
+    bump_trip_version(db, trip_id)
     db.commit()
     db.refresh(dest)
 
@@ -88,11 +73,8 @@ def reorder_destination(
     dest_id: int,
     direction: str,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    access: TripAccess = Depends(trip_editor),
 ):
-    trip = _get_trip(db, trip_id)
-    _require_owner_or_editor(trip, current_user.id)
-
     dest = db.query(TripDestination).filter(TripDestination.id == dest_id, TripDestination.trip_id == trip_id).first()
     if not dest:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found")
@@ -117,19 +99,18 @@ def reorder_destination(
 
     if swap:
         dest.sort_order, swap.sort_order = swap.sort_order, dest.sort_order
+        bump_trip_version(db, trip_id)
         db.commit()
 
     return {"status": "ok"}
 
 
 @router.delete("/{trip_id}/destinations/{dest_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_destination(trip_id: int, dest_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip(db, trip_id)
-    _require_owner_or_editor(trip, current_user.id)
-
+def delete_destination(trip_id: int, dest_id: int, db: Session = Depends(get_db), access: TripAccess = Depends(trip_editor)):
     dest = db.query(TripDestination).filter(TripDestination.id == dest_id, TripDestination.trip_id == trip_id).first()
     if not dest:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Destination not found")
     db.delete(dest)
+    bump_trip_version(db, trip_id)
     db.commit()
     return None
@@ -1,60 +1,121 @@
 """Event management endpoints."""
 
-from datetime import date as date_type
+from datetime import date as date_type, time as time_type
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
 
-from app.db import get_db
-from app.models import Event, Trip, TripMember
+from app.db import get_async_db, get_db, run_session
+from app.models import Event, Expense
+from app.routers.access import (
+    EntityAccess,
+    TripAccess,
+    event_with_access,
+    load_trip_access,
+    require_edit,
+    trip_editor,
+)
 from app.routers.auth import get_current_user
-from app.schemas import EventCreate, EventRead, EventUpdate
+from app.routers.conditional import cached_trip_read, conditional_trip_read
+from app.routers.pagination import (
+    cursor_date,
+    cursor_int,
+    cursor_time,
+    decode_typed_cursor,
+    encode_cursor,
+    nullable,
+    set_next_cursor,
+)
+from app.schemas import (
+    EventBatchRequest,
+    EventBatchResponse,
+    EventCreate,
+    EventRead,
+    EventUpdate,
+    ItineraryCloneRequest,
+    ItineraryCloneResponse,
+)
+from app.services.budget_rollups import remove_event_expenses
+from app.services.itinerary import clone_itinerary
+from app.services.trip_version import bump_trip_version
 
 router = APIRouter(tags=["events"])
 
+EVENTS_PAGE_SIZE = 200
 
-def _get_trip(db: Session, trip_id: int) -> Trip:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    return trip
 
+def _after_event(after_date: date_type, after_time: Optional[time_type], after_id: int):
+    """Keyset predicate for ORDER BY date, start_time NULLS LAST, id."""
+    if after_time is None:
+        same_day = and_(Event.start_time.is_(None), Event.id > after_id)
+    else:
+        same_day = or_(
+            Event.start_time > after_time,
+            Event.start_time.is_(None),
+            and_(Event.start_time == after_time, Event.id > after_id),
+        )
+    return or_(Event.date > after_date, and_(Event.date == after_date, same_day))
 
-def _user_role_for_trip(trip: Trip, user_id: int) -> Optional[str]:
-    if trip.owner_id == user_id:
-        return "owner"
-    membership = next((m for m in trip.members if m.user_id == user_id), None)
-    return membership.role if membership else None
-
-
-def _require_view_access(trip: Trip, user_id: int) -> str:
-    role = _user_role_for_trip(trip, user_id)
-    if not role:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this trip")
-    return role
 
+def _trip_events(
+    db: Session,
+    trip_id: int,
+    date: Optional[date_type],
+    date_from: Optional[date_type],
+    date_to: Optional[date_type],
+    type: Optional[List[str]],
+    after: Optional[tuple],
+    limit: Optional[int],
+) -> List[Event]:
+    query = db.query(Event).filter(Event.trip_id == trip_id)
+    if date:
+        query = query.filter(Event.date == date)
+    if date_from:
+        query = query.filter(Event.date >= date_from)
+    if date_to:
+        query = query.filter(Event.date <= date_to)
+    if type:
+        query = query.filter(Event.type.in_(type))
 
-def _require_edit_access(trip: Trip, user_id: int) -> None:
-    role = _require_view_access(trip, user_id)
-    if role not in {"owner", "editor"}:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only owner or editor can modify events")
+    if after:
+        query = query.filter(_after_event(*after))
+    query = query.order_by(Event.date, Event.start_time.asc().nulls_last(), Event.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 
 @router.get("/trips/{trip_id}/events", response_model=List[EventRead])
-def list_events(
+@cached_trip_read("events", List[EventRead])
+async def list_events(
     trip_id: int,
+    request: Request,
+    response: Response,
     date: Optional[date_type] = Query(default=None),
-    db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    date_from: Optional[date_type] = Query(default=None, alias="from"),
+    date_to: Optional[date_type] = Query(default=None, alias="to"),
+    type: Optional[List[str]] = Query(default=None),
+    limit: Optional[int] = Query(default=None, ge=1, le=1000),
+    cursor: Optional[str] = Query(default=None),
+    db=Depends(get_async_db),
+    access: TripAccess = Depends(conditional_trip_read("events")),
 ):
-    trip = _get_trip(db, trip_id)
-    _require_view_access(trip, current_user.id)
-
-    query = db.query(Event).filter(Event.trip_id == trip_id)
-    if date:
-        query = query.filter(Event.date == date)
-    events = query.order_by(Event.date, Event.start_time).all()
+    """Events ordered by (date, start_time, id), served from the (trip_id, date, start_time, id) index.
+
+    Without `limit` or `cursor` the whole itinerary is returned. Otherwise pages are keyset-based
+    (`EVENTS_PAGE_SIZE` by default): pass the `X-Next-Cursor` response header back as `cursor`.
+    """
+    after = decode_typed_cursor(cursor, cursor_date, nullable(cursor_time), cursor_int)
+    if limit is None and after is None:
+        return await run_session(db, _trip_events, trip_id, date, date_from, date_to, type, None, None)
+    limit = limit or EVENTS_PAGE_SIZE
+    events = await run_session(db, _trip_events, trip_id, date, date_from, date_to, type, after, limit + 1)
+    if len(events) > limit:
+        events = events[:limit]
+        last = events[-1]
+        set_next_cursor(response, encode_cursor(last.date, last.start_time, last.id))
     return events
 
 
@@ -63,53 +124,132 @@ def create_event(
     trip_id: int,
     payload: EventCreate,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    access: TripAccess = Depends(trip_editor),
 ):
-    trip = _get_trip(db, trip_id)
-    _require_edit_access(trip, current_user.id)
-
     if payload.trip_id != trip_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Trip ID mismatch")
 
     event = Event(**payload.model_dump())
     db.add(event)
+    bump_trip_version(db, trip_id)
     db.commit()
     db.refresh(event)
     return event
 
 
-def _get_event_or_404(db: Session, event_id: int) -> Event:
-    event = db.query(Event).filter(Event.id == event_id).first()
-    if not event:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Event not found")
-    return event
+@router.post("/trips/{trip_id}/events:batch", response_model=EventBatchResponse)
+def batch_events(
+    trip_id: int,
+    payload: EventBatchRequest,
+    db: Session = Depends(get_db),
+    access: TripAccess = Depends(trip_editor),
+):
+    """Create, update and delete many events of one trip in a single transaction.
+
+    Every referenced event must belong to the trip; otherwise nothing is applied.
+    """
+    if any(item.trip_id != trip_id for item in payload.create):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Trip ID mismatch")
+
+    update_ids = [item.id for item in payload.update]
+    delete_ids = set(payload.delete)
+    if len(set(update_ids)) != len(update_ids) or delete_ids.intersection(update_ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Each event may appear only once per batch")
+
+    referenced = set(update_ids) | delete_ids
+    existing = {}
+    if referenced:
+        existing = {
+            event.id: event
+            for event in db.query(Event).filter(Event.trip_id == trip_id, Event.id.in_(referenced)).all()
+        }
+    missing = sorted(referenced - existing.keys())
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Events not found in this trip: {missing}")
+
+    for item in payload.update:
+        event = existing[item.id]
+        for field, value in item.model_dump(exclude_unset=True, exclude={"id"}).items():
+            setattr(event, field, value)
+
+    if delete_ids:
+        # Same effect as the Event -> Expense cascade, without loading each event's expenses.
+        remove_event_expenses(db, list(delete_ids))
+        db.query(Expense).filter(Expense.event_id.in_(delete_ids)).delete(synchronize_session=False)
+        for event_id in delete_ids:
+            db.expunge(existing[event_id])
+        db.query(Event).filter(Event.id.in_(delete_ids)).delete(synchronize_session=False)
+
+    created = [Event(**item.model_dump()) for item in payload.create]
+    db.add_all(created)
+    bump_trip_version(db, trip_id)
+    db.commit()
+
+    # Reload created and updated rows with one query instead of a refresh per event.
+    returned_ids = [event.id for event in created] + update_ids
+    if returned_ids:
+        db.query(Event).filter(Event.id.in_(returned_ids)).all()
+    return EventBatchResponse(
+        created=[EventRead.model_validate(event) for event in created],
+        updated=[EventRead.model_validate(existing[event_id]) for event_id in update_ids],
+        deleted=sorted(delete_ids),
+    )
+
+
+@router.post(
+    "/trips/{trip_id}/events:clone",
+    response_model=ItineraryCloneResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+def clone_events(
+    trip_id: int,
+    payload: ItineraryCloneRequest,
+    db: Session = Depends(get_db),
+    access: TripAccess = Depends(trip_editor),
+    current_user=Depends(get_current_user),
+):
+    """Append another trip's events to this one, shifted by `day_offset` days.
+
+    The caller needs edit access here and at least view access to the source trip. Without an
+    offset, events keep their position relative to the trip start date.
+    """
+    source = load_trip_access(db, payload.source_trip_id, current_user.id).trip
+    day_offset = payload.day_offset
+    if day_offset is None:
+        day_offset = (access.trip.start_date - source.start_date).days
+
+    created = clone_itinerary(db, source.id, trip_id, day_offset)
+    if created:
+        bump_trip_version(db, trip_id)
+    db.commit()
+    return ItineraryCloneResponse(source_trip_id=source.id, day_offset=day_offset, created=created)
 
 
 @router.patch("/events/{event_id}", response_model=EventRead)
 def update_event(
-    event_id: int,
     payload: EventUpdate,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    loaded: EntityAccess[Event] = Depends(event_with_access),
 ):
-    event = _get_event_or_404(db, event_id)
-    trip = _get_trip(db, event.trip_id)
-    _require_edit_access(trip, current_user.id)
+    require_edit(loaded.access)
+    event = loaded.entity
 
     for field, value in payload.model_dump(exclude_unset=True).items():
         setattr(event, field, value)
 
+    bump_trip_version(db, event.trip_id)
     db.commit()
     db.refresh(event)
     return event
 
 
 @router.delete("/events/{event_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_event(event_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    event = _get_event_or_404(db, event_id)
-    trip = _get_trip(db, event.trip_id)
-    _require_edit_access(trip, current_user.id)
+def delete_event(db: Session = Depends(get_db), loaded: EntityAccess[Event] = Depends(event_with_access)):
+    require_edit(loaded.access)
 
-    db.delete(event)
+    # The event's expenses are cascade-deleted with it.
+    remove_event_expenses(db, [loaded.entity.id])
+    bump_trip_version(db, loaded.entity.trip_id)
+    db.delete(loaded.entity)
     db.commit()
     return None
@@ -0,0 +1,64 @@
+"""Background export jobs and cached artifact downloads."""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import FileResponse
+
+from app.db import get_async_db, run_session
+from app.routers.access import load_trip_access
+from app.routers.auth import get_current_user
+from app.schemas import ExportJobRead
+from app.services.export_jobs import DONE, ExportJob, get_job, submit_pdf_export, touch_artifact
+
+router = APIRouter(tags=["exports"])
+
+
+def _job_read(request: Request, job: ExportJob) -> ExportJobRead:
+    read = ExportJobRead.model_validate(job)
+    if job.status == DONE:
+        read.download_url = str(request.url_for("download_export", job_id=job.id))
+    return read
+
+
+async def _load_job(db, job_id: str, user_id: int) -> ExportJob:
+    job = get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Export job not found")
+    # Access is re-checked on every poll and download, so removed members lose access.
+    await run_session(db, load_trip_access, job.trip_id, user_id)
+    return job
+
+
+@router.post("/trips/{trip_id}/exports/pdf", response_model=ExportJobRead, status_code=status.HTTP_202_ACCEPTED)
+async def create_pdf_export(trip_id: int, request: Request, db=Depends(get_async_db), current_user=Depends(get_current_user)):
+    """Queue a PDF render; an unchanged trip is served from the cached artifact immediately."""
+    access = await run_session(db, load_trip_access, trip_id, current_user.id)
+    job = await submit_pdf_export(db, access.trip)
+    return _job_read(request, job)
+
+
+@router.get("/exports/{job_id}", response_model=ExportJobRead)
+async def get_export(job_id: str, request: Request, db=Depends(get_async_db), current_user=Depends(get_current_user)):
+    job = await _load_job(db, job_id, current_user.id)
+    return _job_read(request, job)
+
+
+@router.get("/exports/{job_id}/download", name="download_export")
+async def download_export(job_id: str, request: Request, db=Depends(get_async_db), current_user=Depends(get_current_user)):
+    """Serve a finished artifact. The ETag is its content hash; Range requests are supported."""
+    job = await _load_job(db, job_id, current_user.id)
+    if job.status != DONE:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Export is {job.status}")
+
+    # Artifacts can be pruned, or lost with the local disk, after their job finished.
+    if not touch_artifact(job.path):
+        raise HTTPException(status_code=status.HTTP_410_GONE, detail="Export artifact expired; request a new export")
+
+    etag = f'"{job.content_hash}"'
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return FileResponse(
+        job.path,
+        media_type="application/pdf",
+        filename=f"trip-{job.trip_id}.pdf",
+        headers={"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"},
+    )
@@ -0,0 +1,26 @@
+"""Operational metrics for caches and connection pools."""
+
+from fastapi import APIRouter
+
+from app.db import pool_stats
+from app.routers.auth import auth_cache_stats
+from app.services.export_jobs import export_job_stats
+from app.services.forecast_cache import forecast_cache_stats
+from app.services.geocode_cache import geocode_cache_stats
+from app.services.response_cache import response_cache_stats
+from app.services.single_flight import single_flight_stats
+
+router = APIRouter(prefix="/metrics", tags=["health"])
+
+
+@router.get("")
+def metrics():
+    return {
+        "db_pool": pool_stats(),
+        "auth_cache": auth_cache_stats(),
+        "geocode_cache": geocode_cache_stats(),
+        "forecast_cache": forecast_cache_stats(),
+        "single_flight": single_flight_stats(),
+        "export_jobs": export_job_stats(),
+        "response_cache": response_cache_stats(),
+    }
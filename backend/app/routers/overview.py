@@ -0,0 +1,153 @@
+"""Trip dashboard: the trip and everything shown under it in one response."""
+
+import asyncio
+import logging
+from datetime import date
+from typing import Any, Dict, Optional, Set
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session, selectinload
+
+from app.db import get_async_db, open_async_db, run_session
+from app.models import BudgetRollup, Trip, TripDestination
+from app.routers.access import load_trip_access
+from app.routers.auth import get_current_user
+from app.schemas import (
+    BudgetEnvelopeRead,
+    EventRead,
+    LocationRead,
+    TripMemberRead,
+    TripRead,
+    TripWeatherDay,
+    TripWeatherResponse,
+)
+from app.services.forecast_cache import cached_daily_forecast
+from app.services.geocode_cache import cached_geocode
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/trips", tags=["trips"])
+
+SECTIONS = ("trip", "members", "events", "destinations", "budget", "weather")
+
+# Relationship loaders per section; each selectinload adds exactly one query.
+_LOADERS = {
+    "members": [selectinload(Trip.members)],
+    "events": [selectinload(Trip.events)],
+    "destinations": [selectinload(Trip.destinations).selectinload(TripDestination.location)],
+    "budget": [selectinload(Trip.budget_envelopes)],
+}
+
+
+def _parse_fields(fields: Optional[str]) -> Set[str]:
+    if not fields:
+        return set(SECTIONS)
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(SECTIONS)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}. Available: {', '.join(SECTIONS)}",
+        )
+    return requested
+
+
+def _load_sections(db: Session, trip_id: int, sections: Set[str]) -> Dict[str, Any]:
+    """Serialise the requested DB-backed sections with one query per section."""
+    options = [loader for name in sections for loader in _LOADERS.get(name, [])]
+    trip = db.query(Trip).options(*options).filter(Trip.id == trip_id).populate_existing().one()
+
+    out: Dict[str, Any] = {}
+    if "trip" in sections:
+        out["trip"] = TripRead.model_validate(trip)
+    if "members" in sections:
+        out["members"] = [TripMemberRead.model_validate(m) for m in trip.members]
+    if "events" in sections:
+        events = sorted(trip.events, key=lambda e: (e.date, e.start_time is None, e.start_time or 0, e.id))
+        out["events"] = [EventRead.model_validate(e) for e in events]
+    if "destinations" in sections:
+        out["destinations"] = [
+            {
+                "id": dest.id,
+                "sort_order": dest.sort_order,
+                "trip_id": dest.trip_id,
+                "location": LocationRead.model_validate(dest.location),
+            }
+            for dest in sorted(trip.destinations, key=lambda d: d.sort_order)
+        ]
+    if "budget" in sections:
+        rollups = (
+            db.query(BudgetRollup)
+            .filter(BudgetRollup.trip_id == trip_id)
+            .filter((BudgetRollup.envelope_count > 0) | (BudgetRollup.expense_count > 0))
+            .all()
+        )
+        out["budget"] = {
+            "envelopes": [BudgetEnvelopeRead.model_validate(e) for e in trip.budget_envelopes],
+            "categories": {
+                r.category: {"planned_total": r.planned_total, "actual_total": r.actual_total} for r in rollups
+            },
+            "totals": {
+                "planned_total_all": sum(r.planned_total for r in rollups),
+                "actual_total_all": sum(r.actual_total for r in rollups),
+            },
+        }
+    return out
+
+
+async def _load_weather(city: str, start_date: date, end_date: date) -> Optional[TripWeatherResponse]:
+    # Runs alongside _load_sections, so the geocode cache gets its own session.
+    async with open_async_db() as db:
+        coords = await cached_geocode(db, city)
+    if not coords:
+        return None
+    daily = await cached_daily_forecast(coords[0], coords[1], start_date, end_date)
+    return TripWeatherResponse(
+        city=city,
+        start_date=start_date,
+        end_date=end_date,
+        days=[TripWeatherDay(**d) for d in daily],
+    )
+
+
+@router.get("/{trip_id}/overview")
+async def trip_overview(
+    trip_id: int,
+    fields: Optional[str] = Query(default=None, description=f"Comma-separated subset of: {', '.join(SECTIONS)}"),
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """Trip, members, events, destinations, budget totals and weather with one access check.
+
+    Database sections are loaded in a fixed number of queries while the forecast is fetched
+    concurrently. A weather failure leaves `weather` null and is reported under `errors`
+    instead of failing the whole response.
+    """
+    sections = _parse_fields(fields)
+    trip = (await run_session(db, load_trip_access, trip_id, current_user.id)).trip
+
+    db_sections = sections - {"weather"}
+    weather_task = None
+    if "weather" in sections:
+        # Plain values only: the trip instance belongs to a session used concurrently below.
+        weather_task = asyncio.ensure_future(_load_weather(trip.destination, trip.start_date, trip.end_date))
+    try:
+        out = await run_session(db, _load_sections, trip_id, db_sections) if db_sections else {}
+    except BaseException:
+        if weather_task is not None:
+            weather_task.cancel()
+        raise
+
+    errors: Dict[str, str] = {}
+    if weather_task is not None:
+        try:
+            out["weather"] = await weather_task
+            if out["weather"] is None:
+                errors["weather"] = "Could not find location for this trip's destination"
+        except Exception:
+            logger.warning("Weather for trip %s unavailable", trip_id, exc_info=True)
+            out["weather"] = None
+            errors["weather"] = "Weather provider unavailable"
+    if errors:
+        out["errors"] = errors
+    return out
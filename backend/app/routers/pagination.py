@@ -0,0 +1,74 @@
+"""Opaque keyset-pagination cursors shared by list endpoints."""
+
+import base64
+import json
+from datetime import date, time
+from typing import Any, Callable, List, Optional, Tuple
+
+from fastapi import HTTPException, Response, status
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def _decode_values(cursor: Optional[str], size: int) -> Optional[List[Any]]:
+    """Return the raw cursor values (dates/times as ISO strings) or None when no cursor was given."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        values = None
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+
+# A cursor field parser turns a raw JSON value into the typed value, raising ValueError if it is not one.
+CursorField = Callable[[Any], Any]
+
+
+def cursor_int(value: Any) -> int:
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"expected an integer, got {value!r}")
+    return value
+
+
+def cursor_date(value: Any) -> date:
+    if not isinstance(value, str):
+        raise ValueError(f"expected an ISO date, got {value!r}")
+    return date.fromisoformat(value)
+
+
+def cursor_time(value: Any) -> time:
+    if not isinstance(value, str):
+        raise ValueError(f"expected an ISO time, got {value!r}")
+    return time.fromisoformat(value)
+
+
+def nullable(field: CursorField) -> CursorField:
+    return lambda value: None if value is None else field(value)
+
+
+def decode_typed_cursor(cursor: Optional[str], *fields: CursorField) -> Optional[Tuple[Any, ...]]:
+    """Decode a cursor and parse each value with its field, e.g. `(cursor_date, cursor_int)`.
+
+    Returns None when no cursor was given; a malformed or tampered cursor is a 400.
+    """
+    values = _decode_values(cursor, len(fields))
+    if values is None:
+        return None
+    try:
+        return tuple(field(value) for field, value in zip(fields, values))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def set_next_cursor(response: Response, cursor: Optional[str]) -> None:
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
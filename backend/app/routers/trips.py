@@ -1,64 +1,123 @@
 """Trip management endpoints."""
 
-from typing import List, Optional
-import io
+from datetime import date
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
 
 from pydantic import BaseModel
-from sqlalchemy import or_
+from sqlalchemy import and_, exists, or_
 from sqlalchemy.orm import Session
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfgen import canvas
 
-from app.db import get_db
-from app.models import Trip, TripMember, Event, BudgetEnvelope, Expense, WeatherAlert
+from app.config import get_settings
+from app.db import get_async_db, get_db, run_db, run_session
+from app.models import Trip, TripMember
+from app.routers.access import TripAccess, trip_owner, trip_viewer
 from app.routers.auth import get_current_user
+from app.routers.conditional import cached_trip_read, conditional_trip_read
+from app.routers.pagination import cursor_date, cursor_int, decode_typed_cursor, encode_cursor, set_next_cursor
 from app.schemas import (
     TripCreate,
     TripMemberRead,
     TripRead,
     TripUpdate,
 )
+from app.services.exporters import FORMATS, stream_export, trip_scope, user_scope
+from app.services.pdf_export import iter_file, spooled_trip_pdf
+from app.services.trip_version import bump_trip_version
 
 router = APIRouter(prefix="/trips", tags=["trips"])
 
 
+TRIPS_PAGE_SIZE = 100
+
+
 class TripMemberUpsert(BaseModel):
     user_id: int
-    role: str
+    role: Literal["editor", "viewer"]
 
 
-def _get_trip_or_404(db: Session, trip_id: int) -> Trip:
-    trip = db.query(Trip).filter(Trip.id == trip_id).first()
-    if not trip:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Trip not found")
-    return trip
+def _visible_trips(
+    db: Session,
+    user_id: int,
+    period: Optional[str],
+    date_from: Optional[date],
+    date_to: Optional[date],
+    after: Optional[tuple],
+    limit: Optional[int],
+) -> List[Trip]:
+    is_member = exists().where(TripMember.trip_id == Trip.id, TripMember.user_id == user_id)
+    query = db.query(Trip).filter(or_(Trip.owner_id == user_id, is_member))
+
+    today = date.today()
+    if period == "upcoming":
+        query = query.filter(Trip.end_date >= today)
+    elif period == "past":
+        query = query.filter(Trip.end_date < today)
+    if date_from:
+        query = query.filter(Trip.end_date >= date_from)
+    if date_to:
+        query = query.filter(Trip.start_date <= date_to)
+
+    if after:
+        after_start, after_id = after
+        query = query.filter(
+            or_(Trip.start_date > after_start, and_(Trip.start_date == after_start, Trip.id > after_id))
+        )
+
+    query = query.order_by(Trip.start_date, Trip.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.all()
 
 
-def _ensure_member_or_owner(trip: Trip, user_id: int) -> None:
-    is_owner = trip.owner_id == user_id
-    is_member = any(member.user_id == user_id for member in trip.members)
-    if not (is_owner or is_member):
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized for this trip")
+@router.get("", response_model=List[TripRead])
+async def list_trips(
+    response: Response,
+    period: Optional[Literal["upcoming", "past"]] = Query(default=None),
+    date_from: Optional[date] = Query(default=None, alias="from"),
+    date_to: Optional[date] = Query(default=None, alias="to"),
+    limit: Optional[int] = Query(default=None, ge=1, le=500),
+    cursor: Optional[str] = Query(default=None),
+    db=Depends(get_async_db),
+    current_user=Depends(get_current_user),
+):
+    """Trips the caller owns or belongs to, ordered by (start_date, id).
+
+    Without `limit` or `cursor` every matching trip is returned. Otherwise pages are keyset-based
+    (`TRIPS_PAGE_SIZE` by default): pass the `X-Next-Cursor` response header back as `cursor`.
+    `from`/`to` select trips overlapping that date range.
+    """
+    after = decode_typed_cursor(cursor, cursor_date, cursor_int)
+    if limit is None and after is None:
+        return await run_session(db, _visible_trips, current_user.id, period, date_from, date_to, None, None)
+    limit = limit or TRIPS_PAGE_SIZE
+    trips = await run_session(db, _visible_trips, current_user.id, period, date_from, date_to, after, limit + 1)
+    if len(trips) > limit:
+        trips = trips[:limit]
+        set_next_cursor(response, encode_cursor(trips[-1].start_date, trips[-1].id))
+    return trips
 
 
-def _ensure_owner(trip: Trip, user_id: int) -> None:
-    if trip.owner_id != user_id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only owner can perform this action")
+ExportDataset = Literal["events", "expenses", "alerts"]
+ExportFormatName = Literal["ndjson", "csv", "ics"]
 
 
-@router.get("", response_model=List[TripRead])
-def list_trips(db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trips = (
-        db.query(Trip)
-        .outerjoin(TripMember, TripMember.trip_id == Trip.id)
-        .filter(or_(Trip.owner_id == current_user.id, TripMember.user_id == current_user.id))
-        .distinct()
-        .all()
+def _export_response(dataset: str, fmt: str, scope, filename: str, calendar_name: Optional[str] = None) -> StreamingResponse:
+    if not FORMATS[fmt].supports(dataset):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{fmt} export is not available for {dataset}")
+    return StreamingResponse(
+        stream_export(dataset, fmt, scope, calendar_name),
+        media_type=FORMATS[fmt].media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
     )
-    return trips
+
+
+@router.get("/export/{dataset}.{fmt}")
+def export_all_trips(dataset: ExportDataset, fmt: ExportFormatName, current_user=Depends(get_current_user)):
+    """Stream a dataset across every trip the caller owns or belongs to."""
+    return _export_response(dataset, fmt, user_scope(current_user.id), f"trips-{dataset}")
 
 
 @router.post("", response_model=TripRead, status_code=status.HTTP_201_CREATED)
@@ -72,46 +131,44 @@ def create_trip(payload: TripCreate, db: Session = Depends(get_db), current_user
 
 
 @router.get("/{trip_id}", response_model=TripRead)
-def get_trip(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip_or_404(db, trip_id)
-    _ensure_member_or_owner(trip, current_user.id)
-    return trip
+@cached_trip_read("trip", TripRead)
+async def get_trip(request: Request, response: Response, access: TripAccess = Depends(conditional_trip_read("trip"))):
+    return access.trip
 
 
 @router.patch("/{trip_id}", response_model=TripRead)
 def update_trip(
-    trip_id: int,
     payload: TripUpdate,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    access: TripAccess = Depends(trip_owner),
 ):
-    trip = _get_trip_or_404(db, trip_id)
-    _ensure_owner(trip, current_user.id)
-
+    trip = access.trip
     update_data = payload.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(trip, field, value)
 
+    bump_trip_version(db, trip.id)
     db.commit()
     db.refresh(trip)
     return trip
 
 
 @router.delete("/{trip_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_trip(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip_or_404(db, trip_id)
-    _ensure_owner(trip, current_user.id)
-
-    db.delete(trip)
+def delete_trip(db: Session = Depends(get_db), access: TripAccess = Depends(trip_owner)):
+    db.delete(access.trip)
     db.commit()
     return None
 
 
+def _trip_members(db: Session, trip_id: int) -> List[TripMember]:
+    return db.query(TripMember).filter(TripMember.trip_id == trip_id).order_by(TripMember.id).all()
+
+
 @router.get("/{trip_id}/members", response_model=List[TripMemberRead])
-def list_trip_members(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip_or_404(db, trip_id)
-    _ensure_member_or_owner(trip, current_user.id)
-    return trip.members
+async def list_trip_members(
+    trip_id: int, db=Depends(get_async_db), access: TripAccess = Depends(conditional_trip_read("members"))
+):
+    return await run_session(db, _trip_members, trip_id)
 
 
 @router.post("/{trip_id}/members", response_model=TripMemberRead, status_code=status.HTTP_201_CREATED)
@@ -119,11 +176,8 @@ def add_or_update_member(
     trip_id: int,
     payload: TripMemberUpsert,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    access: TripAccess = Depends(trip_owner),
 ):
-    trip = _get_trip_or_404(db, trip_id)
-    _ensure_owner(trip, current_user.id)
-
     member = (
         db.query(TripMember)
         .filter(TripMember.trip_id == trip_id, TripMember.user_id == payload.user_id)
@@ -134,6 +188,7 @@ def add_or_update_member(
     else:
         member = TripMember(trip_id=trip_id, user_id=payload.user_id, role=payload.role)
         db.add(member)
+    bump_trip_version(db, trip_id)
     db.commit()
     db.refresh(member)
     return member
@@ -144,11 +199,8 @@ def delete_member(
     trip_id: int,
     user_id: int,
     db: Session = Depends(get_db),
-    current_user=Depends(get_current_user),
+    access: TripAccess = Depends(trip_owner),
 ):
-    trip = _get_trip_or_404(db, trip_id)
-    _ensure_owner(trip, current_user.id)
-
     member = (
         db.query(TripMember)
         .filter(TripMember.trip_id == trip_id, TripMember.user_id == user_id)
@@ -157,80 +209,28 @@ def delete_member(
     if not member:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Member not found")
     db.delete(member)
+    bump_trip_version(db, trip_id)
     db.commit()
     return None
 
 
 @router.get("/{trip_id}/export/pdf")
-def export_trip_pdf(trip_id: int, db: Session = Depends(get_db), current_user=Depends(get_current_user)):
-    trip = _get_trip_or_404(db, trip_id)
-    _ensure_member_or_owner(trip, current_user.id)
-
-    events = (
-        db.query(Event)
-        .filter(Event.trip_id == trip_id)
-        .order_by(Event.date, Event.start_time)
-        .all()
+async def export_trip_pdf(trip_id: int, db: Session = Depends(get_db), access: TripAccess = Depends(trip_viewer)):
+    """Render on the DB worker pool into a spooled file, then stream it back in chunks."""
+    spool = await run_db(spooled_trip_pdf, db, access.trip)
+    return StreamingResponse(
+        iter_file(spool, get_settings().export_chunk_size),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="trip-{trip_id}.pdf"'},
     )
-    envelopes = db.query(BudgetEnvelope).filter(BudgetEnvelope.trip_id == trip_id).all()
-    expenses = db.query(Expense).filter(Expense.trip_id == trip_id).all()
-    alerts = db.query(WeatherAlert).filter(WeatherAlert.trip_id == trip_id).all()
-
-    buffer = io.BytesIO()
-    p = canvas.Canvas(buffer, pagesize=letter)
-    width, height = letter
-
-    y = height - 50
-    p.setFont("Helvetica-Bold", 16)
-    p.drawString(50, y, f"Trip: {trip.name}")
-    y -= 20
-    p.setFont("Helvetica", 12)
-    p.drawString(50, y, f"Destination: {trip.destination}")
-    y -= 15
-    p.drawString(50, y, f"Dates: {trip.start_date} to {trip.end_date}")
-    y -= 25
-
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(50, y, "Events")
-    y -= 18
-    p.setFont("Helvetica", 11)
-    for evt in events:
-        line = f"{evt.date} - {evt.title} ({evt.type})"
-        if evt.start_time:
-            line += f" @ {evt.start_time}"
-        p.drawString(60, y, line)
-        y -= 14
-        if y < 80:
-            p.showPage()
-            y = height - 50
-
-    y -= 10
-    p.setFont("Helvetica-Bold", 14)
-    p.drawString(50, y, "Budget")
-    y -= 18
-    p.setFont("Helvetica", 11)
-    for env in envelopes:
-        actual = sum(exp.amount for exp in expenses if exp.envelope_id == env.id)
-        p.drawString(60, y, f"{env.category}: planned ${env.planned_amount:.2f} / actual ${actual:.2f}")
-        y -= 14
-        if y < 80:
-            p.showPage()
-            y = height - 50
-
-    if alerts:
-        y -= 10
-        p.setFont("Helvetica-Bold", 14)
-        p.drawString(50, y, "Weather Alerts")
-        y -= 18
-        p.setFont("Helvetica", 11)
-        for alert in alerts:
-            p.drawString(60, y, f"{alert.date} [{alert.severity}] {alert.summary}")
-            y -= 14
-            if y < 80:
-                p.showPage()
-                y = height - 50
-
-    p.showPage()
-    p.save()
-    buffer.seek(0)
-    return StreamingResponse(buffer, media_type="application/pdf", headers={"Content-Disposition": f'attachment; filename="trip-{trip_id}.pdf"'})
+
+
+@router.get("/{trip_id}/export/{dataset}.{fmt}")
+def export_trip_data(
+    trip_id: int,
+    dataset: ExportDataset,
+    fmt: ExportFormatName,
+    access: TripAccess = Depends(trip_viewer),
+):
+    """Stream one trip's events, expenses or alerts as NDJSON or CSV, or its events as iCalendar."""
+    return _export_response(dataset, fmt, trip_scope(trip_id), f"trip-{trip_id}-{dataset}", access.trip.name)
@@ -52,6 +52,7 @@ class TripRead(BaseModel):
     destination: str
     start_date: date
     end_date: date
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -120,6 +121,22 @@ class EventUpdate(BaseModel):
     notes: Optional[str] = None
 
 
+class EventBatchUpdate(EventUpdate):
+    id: int
+
+
+class EventBatchRequest(BaseModel):
+    create: list[EventCreate] = []
+    update: list[EventBatchUpdate] = []
+    delete: list[int] = []
+
+
+class ItineraryCloneRequest(BaseModel):
+    source_trip_id: int
+    # Days added to every cloned event's date; defaults to the gap between the trips' start dates.
+    day_offset: Optional[int] = None
+
+
 class EventRead(BaseModel):
     id: int
     trip_id: int
@@ -135,6 +152,18 @@ class EventRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class EventBatchResponse(BaseModel):
+    created: list[EventRead]
+    updated: list[EventRead]
+    deleted: list[int]
+
+
+class ItineraryCloneResponse(BaseModel):
+    source_trip_id: int
+    day_offset: int
+    created: int
+
+
 class BudgetEnvelopeCreate(BaseModel):
     trip_id: int
     category: str
@@ -186,6 +215,19 @@ class WeatherAlertRead(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class ExportJobRead(BaseModel):
+    id: str
+    trip_id: int
+    format: str
+    status: str
+    error: Optional[str] = None
+    cached: bool
+    content_hash: str
+    download_url: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class TripWeatherDay(BaseModel):
     date: date
     temp_max: float
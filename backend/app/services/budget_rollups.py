@@ -0,0 +1,274 @@
+"""Incrementally maintained per-trip, per-category budget totals.
+
+The budget routes apply deltas to `budget_rollups` in the same transaction as the envelope or
+expense change, so the summary reads one row per category. `rebuild` recomputes rows from the
+source tables and `verify` reports drift; both are exposed on the command line with
+`python -m app.services.budget_rollups rebuild|verify [--trip ID]`.
+"""
+
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import func, literal, union_all
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal, dialect_insert
+from app.models import BudgetEnvelope, BudgetRollup, Expense
+from app.services.trip_version import bump_trip_version
+
+UNCATEGORIZED = "uncategorized"
+
+# Float sums drift slightly depending on the order they were accumulated in.
+TOLERANCE = 0.005
+
+RollupKey = Tuple[int, str]
+
+
+@dataclass
+class RollupTotals:
+    planned_total: float = 0.0
+    actual_total: float = 0.0
+    envelope_count: int = 0
+    expense_count: int = 0
+
+
+@dataclass
+class RollupDrift:
+    trip_id: int
+    category: str
+    stored: RollupTotals
+    expected: RollupTotals
+
+
+def apply_rollup_delta(
+    db: Session,
+    trip_id: int,
+    category: str,
+    planned: float = 0.0,
+    actual: float = 0.0,
+    envelopes: int = 0,
+    expenses: int = 0,
+) -> None:
+    """Add the given deltas to the (trip_id, category) rollup row, creating it if needed."""
+    if not (planned or actual or envelopes or expenses):
+        return
+
+    insert = dialect_insert(db)
+    if insert is not None:
+        stmt = insert(BudgetRollup).values(
+            trip_id=trip_id,
+            category=category,
+            planned_total=planned,
+            actual_total=actual,
+            envelope_count=envelopes,
+            expense_count=expenses,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BudgetRollup.trip_id, BudgetRollup.category],
+            set_={
+                "planned_total": BudgetRollup.planned_total + stmt.excluded.planned_total,
+                "actual_total": BudgetRollup.actual_total + stmt.excluded.actual_total,
+                "envelope_count": BudgetRollup.envelope_count + stmt.excluded.envelope_count,
+                "expense_count": BudgetRollup.expense_count + stmt.excluded.expense_count,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    row = (
+        db.query(BudgetRollup)
+        .filter(BudgetRollup.trip_id == trip_id, BudgetRollup.category == category)
+        .with_for_update()
+        .first()
+    )
+    if row is None:
+        row = BudgetRollup(
+            trip_id=trip_id, category=category, planned_total=0.0, actual_total=0.0, envelope_count=0, expense_count=0
+        )
+        db.add(row)
+    row.planned_total += planned
+    row.actual_total += actual
+    row.envelope_count += envelopes
+    row.expense_count += expenses
+    db.flush()
+
+
+def expense_category(db: Session, envelope_id: Optional[int]) -> str:
+    """Category an expense rolls up under: its envelope's category, or "uncategorized"."""
+    if envelope_id is None:
+        return UNCATEGORIZED
+    category = db.query(BudgetEnvelope.category).filter(BudgetEnvelope.id == envelope_id).scalar()
+    return category if category is not None else UNCATEGORIZED
+
+
+def envelope_expense_totals(db: Session, envelope_id: int) -> Tuple[float, int]:
+    """Sum and count of the expenses currently assigned to an envelope."""
+    total, count = (
+        db.query(func.coalesce(func.sum(Expense.amount), 0.0), func.count(Expense.id))
+        .filter(Expense.envelope_id == envelope_id)
+        .one()
+    )
+    return float(total), int(count)
+
+
+def move_envelope_expenses(db: Session, envelope: BudgetEnvelope, old_category: str, new_category: str) -> None:
+    """Move the actual totals of an envelope's expenses from one category to another."""
+    if old_category == new_category:
+        return
+    total, count = envelope_expense_totals(db, envelope.id)
+    if not count:
+        return
+    apply_rollup_delta(db, envelope.trip_id, old_category, actual=-total, expenses=-count)
+    apply_rollup_delta(db, envelope.trip_id, new_category, actual=total, expenses=count)
+
+
+def remove_event_expenses(db: Session, event_ids: List[int]) -> None:
+    """Subtract the expenses that will be deleted together with the given events."""
+    category = func.coalesce(BudgetEnvelope.category, UNCATEGORIZED)
+    rows = (
+        db.query(Expense.trip_id, category, func.sum(Expense.amount), func.count(Expense.id))
+        .select_from(Expense)
+        .outerjoin(BudgetEnvelope, BudgetEnvelope.id == Expense.envelope_id)
+        .filter(Expense.event_id.in_(event_ids))
+        .group_by(Expense.trip_id, category)
+        .all()
+    )
+    for trip_id, cat, total, count in rows:
+        apply_rollup_delta(db, trip_id, cat, actual=-float(total), expenses=-int(count))
+
+
+def compute_rollups(db: Session, trip_id: Optional[int] = None) -> Dict[RollupKey, RollupTotals]:
+    """Aggregate the source tables into rollup totals, optionally for one trip."""
+    envelopes = db.query(
+        BudgetEnvelope.trip_id.label("trip_id"),
+        BudgetEnvelope.category.label("category"),
+        BudgetEnvelope.planned_amount.label("planned"),
+        literal(0.0).label("actual"),
+        literal(1).label("envelopes"),
+        literal(0).label("expenses"),
+    )
+    expenses = db.query(
+        Expense.trip_id,
+        func.coalesce(BudgetEnvelope.category, UNCATEGORIZED),
+        literal(0.0),
+        Expense.amount,
+        literal(0),
+        literal(1),
+    ).outerjoin(BudgetEnvelope, BudgetEnvelope.id == Expense.envelope_id)
+    if trip_id is not None:
+        envelopes = envelopes.filter(BudgetEnvelope.trip_id == trip_id)
+        expenses = expenses.filter(Expense.trip_id == trip_id)
+
+    rows = union_all(envelopes.statement, expenses.statement).subquery()
+    aggregated = (
+        db.query(
+            rows.c.trip_id,
+            rows.c.category,
+            func.sum(rows.c.planned),
+            func.sum(rows.c.actual),
+            func.sum(rows.c.envelopes),
+            func.sum(rows.c.expenses),
+        )
+        .group_by(rows.c.trip_id, rows.c.category)
+        .all()
+    )
+    return {
+        (trip, category): RollupTotals(float(planned or 0), float(actual or 0), int(env_count or 0), int(exp_count or 0))
+        for trip, category, planned, actual, env_count, exp_count in aggregated
+    }
+
+
+def stored_rollups(db: Session, trip_id: Optional[int] = None) -> Dict[RollupKey, RollupTotals]:
+    query = db.query(BudgetRollup)
+    if trip_id is not None:
+        query = query.filter(BudgetRollup.trip_id == trip_id)
+    return {
+        (row.trip_id, row.category): RollupTotals(
+            row.planned_total, row.actual_total, row.envelope_count, row.expense_count
+        )
+        for row in query.all()
+    }
+
+
+def _matches(a: RollupTotals, b: RollupTotals) -> bool:
+    return (
+        abs(a.planned_total - b.planned_total) <= TOLERANCE
+        and abs(a.actual_total - b.actual_total) <= TOLERANCE
+        and a.envelope_count == b.envelope_count
+        and a.expense_count == b.expense_count
+    )
+
+
+def verify(db: Session, trip_id: Optional[int] = None) -> List[RollupDrift]:
+    """Compare stored rollups with the source tables and return every mismatching category."""
+    expected = compute_rollups(db, trip_id)
+    stored = stored_rollups(db, trip_id)
+    empty = RollupTotals()
+    drift = []
+    for key in sorted(set(expected) | set(stored)):
+        want = expected.get(key, empty)
+        have = stored.get(key, empty)
+        if not _matches(have, want):
+            drift.append(RollupDrift(trip_id=key[0], category=key[1], stored=have, expected=want))
+    return drift
+
+
+def rebuild(db: Session, trip_id: Optional[int] = None) -> int:
+    """Replace stored rollups with freshly aggregated totals. Returns the number of rows written.
+
+    Trips whose totals change get a version bump, so conditional and cached budget reads do not
+    keep serving the drifted values.
+    """
+    expected = compute_rollups(db, trip_id)
+    stored = stored_rollups(db, trip_id)
+    empty = RollupTotals()
+    changed = {
+        key[0] for key in set(expected) | set(stored) if not _matches(stored.get(key, empty), expected.get(key, empty))
+    }
+    delete = db.query(BudgetRollup)
+    if trip_id is not None:
+        delete = delete.filter(BudgetRollup.trip_id == trip_id)
+    delete.delete(synchronize_session=False)
+    db.add_all(
+        BudgetRollup(
+            trip_id=trip,
+            category=category,
+            planned_total=totals.planned_total,
+            actual_total=totals.actual_total,
+            envelope_count=totals.envelope_count,
+            expense_count=totals.expense_count,
+        )
+        for (trip, category), totals in expected.items()
+    )
+    for changed_trip_id in sorted(changed):
+        bump_trip_version(db, changed_trip_id)
+    db.commit()
+    return len(expected)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild or verify the budget rollup table.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--trip", type=int, default=None, help="Limit to one trip id.")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "rebuild":
+            print(f"rebuilt {rebuild(db, args.trip)} rollup rows")
+            return
+        drift = verify(db, args.trip)
+    finally:
+        db.close()
+
+    for item in drift:
+        print(f"trip {item.trip_id} / {item.category}: stored={item.stored} expected={item.expected}")
+    print(f"{len(drift)} drifted rollup rows")
+    if drift:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
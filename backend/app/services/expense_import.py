@@ -0,0 +1,212 @@
+"""Streaming bulk import of expenses from CSV or NDJSON.
+
+The request body is consumed line by line and validated against `ExpenseCreate` in chunks;
+each valid chunk is inserted with a single executemany and committed together with its budget
+rollup deltas, so memory stays bounded by the chunk size rather than the file size. Chunks
+committed before a failure (or a client disconnect) stay committed.
+"""
+
+import codecs
+import csv
+import json
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.db import run_session
+from app.models import BudgetEnvelope, Event, Expense
+from app.schemas import ExpenseCreate
+from app.services.budget_rollups import UNCATEGORIZED, apply_rollup_delta
+from app.services.trip_version import bump_trip_version
+
+CSV = "csv"
+NDJSON = "ndjson"
+
+# A single row never legitimately needs more than this; longer lines are rejected rather than
+# buffered.
+MAX_LINE_BYTES = 64 * 1024
+
+
+class ImportFormatError(ValueError):
+    """The body cannot be read as the declared format (as opposed to a single bad row)."""
+
+
+@dataclass
+class RowError:
+    line: int
+    errors: List[str]
+
+
+@dataclass
+class ImportResult:
+    inserted: int = 0
+    failed: int = 0
+    errors: List[RowError] = field(default_factory=list)
+    errors_truncated: bool = False
+
+    def add_error(self, line: int, errors: List[str], max_errors: int) -> None:
+        self.failed += 1
+        if len(self.errors) < max_errors:
+            self.errors.append(RowError(line=line, errors=errors))
+        else:
+            self.errors_truncated = True
+
+
+def format_for_content_type(content_type: Optional[str]) -> Optional[str]:
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in ("text/csv", "application/csv"):
+        return CSV
+    if media_type in ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/x-jsonlines"):
+        return NDJSON
+    return None
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into (line_number, text) pairs, skipping blank lines.
+
+    Lines are split before decoding (b"\\n" never occurs inside a multi-byte UTF-8 sequence), so
+    `MAX_LINE_BYTES` is enforced on raw bytes, both for complete lines and the pending partial one.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_no += 1
+            if len(raw) > MAX_LINE_BYTES:
+                raise ImportFormatError(f"Line {line_no} exceeds {MAX_LINE_BYTES} bytes")
+            line = decoder.decode(raw)
+            if line.strip():
+                yield line_no, line.rstrip("\r")
+        if len(buffer) > MAX_LINE_BYTES:
+            raise ImportFormatError(f"Line {line_no + 1} exceeds {MAX_LINE_BYTES} bytes")
+    line = decoder.decode(buffer, final=True)
+    if line.strip():
+        yield line_no + 1, line.rstrip("\r")
+
+
+async def _iter_records(lines: AsyncIterator[Tuple[int, str]], fmt: str) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield (line_number, record) where record is a dict, or an error string for unparsable lines.
+
+    CSV input needs a header row and one record per line (no quoted embedded newlines).
+    """
+    header: Optional[List[str]] = None
+    async for line_no, line in lines:
+        if fmt == NDJSON:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield line_no, f"invalid JSON: {exc.msg}"
+                continue
+            yield line_no, record if isinstance(record, dict) else "expected a JSON object"
+            continue
+
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_no, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells mean "not given" so schema defaults apply.
+        yield line_no, {name: value for name, value in zip(header, values) if value != ""}
+
+
+def _validate(trip_id: int, record: Any) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+    if isinstance(record, str):
+        return None, [record]
+    record = {key: value for key, value in record.items() if value is not None}
+    record.setdefault("trip_id", trip_id)
+    try:
+        expense = ExpenseCreate.model_validate(record)
+    except ValidationError as exc:
+        return None, [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in exc.errors()]
+    if expense.trip_id != trip_id:
+        return None, ["trip_id: does not match the trip in the URL"]
+    return expense.model_dump(), []
+
+
+def insert_chunk(db: Session, trip_id: int, rows: List[Tuple[int, Dict[str, Any]]]) -> List[RowError]:
+    """Insert validated rows in one executemany and commit them with their rollup deltas.
+
+    Rows that reference an envelope or event outside the trip are rejected and returned.
+    """
+    envelope_ids = {values["envelope_id"] for _, values in rows if values["envelope_id"] is not None}
+    event_ids = {values["event_id"] for _, values in rows if values["event_id"] is not None}
+    categories: Dict[int, str] = {}
+    if envelope_ids:
+        categories = dict(
+            db.query(BudgetEnvelope.id, BudgetEnvelope.category)
+            .filter(BudgetEnvelope.trip_id == trip_id, BudgetEnvelope.id.in_(envelope_ids))
+            .all()
+        )
+    known_events = set()
+    if event_ids:
+        known_events = {
+            event_id for (event_id,) in db.query(Event.id).filter(Event.trip_id == trip_id, Event.id.in_(event_ids))
+        }
+
+    rejected: List[RowError] = []
+    accepted: List[Dict[str, Any]] = []
+    deltas: Dict[str, List[float]] = defaultdict(lambda: [0.0, 0])
+    for line, values in rows:
+        errors = []
+        if values["envelope_id"] is not None and values["envelope_id"] not in categories:
+            errors.append("envelope_id: envelope not found in this trip")
+        if values["event_id"] is not None and values["event_id"] not in known_events:
+            errors.append("event_id: event not found in this trip")
+        if errors:
+            rejected.append(RowError(line=line, errors=errors))
+            continue
+        accepted.append(values)
+        delta = deltas[categories.get(values["envelope_id"], UNCATEGORIZED)]
+        delta[0] += values["amount"]
+        delta[1] += 1
+
+    if accepted:
+        db.execute(insert(Expense), accepted)
+        for category, (amount, count) in deltas.items():
+            apply_rollup_delta(db, trip_id, category, actual=amount, expenses=count)
+        bump_trip_version(db, trip_id)
+        db.commit()
+    return rejected
+
+
+async def import_expenses(
+    db: Any,
+    trip_id: int,
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    chunk_size: int,
+    max_errors: int,
+) -> ImportResult:
+    """Stream, validate and insert expenses for a trip, one committed batch per `chunk_size` rows."""
+    result = ImportResult()
+    pending: List[Tuple[int, Dict[str, Any]]] = []
+
+    async def flush() -> None:
+        rejected = await run_session(db, insert_chunk, trip_id, pending)
+        result.inserted += len(pending) - len(rejected)
+        for error in rejected:
+            result.add_error(error.line, error.errors, max_errors)
+        pending.clear()
+
+    async for line_no, record in _iter_records(_iter_lines(chunks), fmt):
+        values, errors = _validate(trip_id, record)
+        if values is None:
+            result.add_error(line_no, errors, max_errors)
+            continue
+        pending.append((line_no, values))
+        if len(pending) >= chunk_size:
+            await flush()
+    if pending:
+        await flush()
+    # Reference errors are found per batch, after earlier lines' validation errors.
+    result.errors.sort(key=lambda error: error.line)
+    return result
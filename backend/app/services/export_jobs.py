@@ -0,0 +1,204 @@
+"""Background trip export jobs backed by content-addressed artifacts on local disk.
+
+Submitting an export snapshots the trip's rows and hashes them. If an artifact with that hash
+already exists the job completes immediately; otherwise the PDF is rendered in a process pool,
+with concurrent submissions of the same content sharing one render. Job records live in this
+process only (a bounded TTL cache), while artifacts in `export_dir` are shared by every worker.
+Serving or reusing an artifact touches its mtime, and `prune_artifacts` deletes the ones that
+have gone unused too long or that no longer fit in `export_dir_max_bytes`.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db import run_session
+from app.models import Trip
+from app.services.pdf_export import TripPdfSnapshot, load_pdf_snapshot, write_snapshot_pdf
+from app.services.single_flight import SingleFlight
+from app.services.ttl_cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+PDF = "pdf"
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+
+@dataclass
+class ExportJob:
+    id: str
+    trip_id: int
+    format: str
+    content_hash: str
+    status: str = PENDING
+    error: Optional[str] = None
+    cached: bool = False
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def path(self) -> str:
+        return artifact_path(self.content_hash, self.format)
+
+
+settings = get_settings()
+_jobs = TTLCache(maxsize=settings.export_job_cache_size, ttl_seconds=settings.export_job_ttl_seconds)
+_renders = SingleFlight()
+# Strong references so running job tasks are not garbage collected.
+_tasks: Set["asyncio.Task[None]"] = set()
+_pool: Optional[ProcessPoolExecutor] = None
+_stats: Dict[str, int] = {"submitted": 0, "artifact_hits": 0, "rendered": 0, "failed": 0, "artifacts_pruned": 0}
+
+
+def artifact_path(content_hash: str, fmt: str) -> str:
+    return os.path.join(settings.export_dir, fmt, f"{content_hash}.{fmt}")
+
+
+def touch_artifact(path: str) -> bool:
+    """Mark an artifact as recently used for cleanup; False if it no longer exists."""
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def prune_artifacts(now: Optional[float] = None) -> int:
+    """Delete stale artifacts, then the least recently used ones over the size budget.
+
+    Left-over temporary files from interrupted renders are removed once they are older than the
+    age limit. Returns the number of files deleted; safe to run from several workers at once.
+    """
+    now = time.time() if now is None else now
+    cutoff = now - settings.export_artifact_max_age_hours * 3600
+    kept: List[Tuple[float, int, str]] = []
+    deleted = 0
+    for root, _dirs, files in os.walk(settings.export_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            try:
+                info = os.stat(path)
+                if info.st_mtime < cutoff:
+                    os.remove(path)
+                    deleted += 1
+                elif not name.endswith(".tmp"):
+                    kept.append((info.st_mtime, info.st_size, path))
+            except FileNotFoundError:
+                continue
+
+    total = sum(size for _mtime, size, _path in kept)
+    for _mtime, size, path in sorted(kept):
+        if total <= settings.export_dir_max_bytes:
+            break
+        try:
+            os.remove(path)
+            deleted += 1
+        except FileNotFoundError:
+            pass
+        total -= size
+
+    _stats["artifacts_pruned"] += deleted
+    return deleted
+
+
+async def run_periodic_cleanup(interval_minutes: int) -> None:
+    """Prune artifacts forever, sleeping `interval_minutes` between runs; cancel the task to stop."""
+    while True:
+        try:
+            deleted = await asyncio.to_thread(prune_artifacts)
+            if deleted:
+                logger.info("Pruned %d export artifacts", deleted)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Export artifact cleanup failed")
+        await asyncio.sleep(interval_minutes * 60)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn: forking a process that runs threads and an event loop is unsafe.
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.export_process_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def _render_artifact(snapshot: TripPdfSnapshot, path: str) -> None:
+    if touch_artifact(path):
+        return
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(_get_pool(), write_snapshot_pdf, snapshot, path)
+    _stats["rendered"] += 1
+
+
+async def _run(job: ExportJob, snapshot: TripPdfSnapshot) -> None:
+    try:
+        await _renders.do(job.content_hash, _render_artifact, snapshot, job.path)
+        job.status = DONE
+    except Exception as exc:
+        _stats["failed"] += 1
+        job.status = FAILED
+        job.error = str(exc) or exc.__class__.__name__
+    finally:
+        job.finished_at = time.time()
+
+
+def _hashed_snapshot(db: Session, trip: Trip) -> Tuple[TripPdfSnapshot, str]:
+    snapshot = load_pdf_snapshot(db, trip)
+    return snapshot, snapshot.content_hash()
+
+
+async def submit_pdf_export(db: Any, trip: Trip) -> ExportJob:
+    """Create a PDF export job for a trip, reusing an existing artifact for unchanged content."""
+    # Loading and hashing the rows both happen off the event loop.
+    snapshot, content_hash = await run_session(db, _hashed_snapshot, trip)
+    job = ExportJob(id=uuid.uuid4().hex, trip_id=trip.id, format=PDF, content_hash=content_hash)
+    _jobs.set(job.id, job)
+    _stats["submitted"] += 1
+
+    if touch_artifact(job.path):
+        _stats["artifact_hits"] += 1
+        job.status, job.cached, job.finished_at = DONE, True, time.time()
+        return job
+
+    task = asyncio.create_task(_run(job, snapshot))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return job
+
+
+def get_job(job_id: str) -> Optional[ExportJob]:
+    job = _jobs.get(job_id)
+    return None if job is MISSING else job
+
+
+def export_job_stats() -> Dict[str, int]:
+    return {**_stats, "running": len(_tasks)}
+
+
+async def shutdown_export_jobs() -> None:
+    """Cancel unfinished jobs and stop the worker processes."""
+    global _pool
+    for task in list(_tasks):
+        task.cancel()
+    if _tasks:
+        await asyncio.gather(*_tasks, return_exceptions=True)
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
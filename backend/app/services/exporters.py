@@ -0,0 +1,210 @@
+"""Streaming machine-readable exports (NDJSON, CSV, iCalendar).
+
+An export is a dataset (a column query over one trip-owned table) restricted to a scope (one
+trip, or every trip a user can see), encoded by a format and streamed in chunks. Rows come from
+`yield_per` server-side cursors and are encoded one at a time, so memory does not grow with the
+number of rows. Each stream opens and closes its own session, as it outlives the request's.
+"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+from sqlalchemy import exists, or_, select
+from sqlalchemy.orm import Query, Session
+
+from app.config import get_settings
+from app.db import SessionLocal
+from app.models import BudgetEnvelope, Event, Expense, Trip, TripMember, WeatherAlert
+
+# Builds the WHERE criterion for a dataset's trip_id column.
+Scope = Callable[[Any], Any]
+
+
+def trip_scope(trip_id: int) -> Scope:
+    return lambda trip_id_column: trip_id_column == trip_id
+
+
+def user_scope(user_id: int) -> Scope:
+    """Every trip the user owns or is a member of, as in GET /trips."""
+    is_member = exists().where(TripMember.trip_id == Trip.id, TripMember.user_id == user_id)
+    visible = select(Trip.id).where(or_(Trip.owner_id == user_id, is_member))
+    return lambda trip_id_column: trip_id_column.in_(visible)
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    query: Callable[[Session, Scope], Query]
+
+
+def _events(db: Session, scope: Scope) -> Query:
+    return (
+        db.query(
+            Event.id,
+            Event.trip_id,
+            Event.date,
+            Event.start_time,
+            Event.end_time,
+            Event.title,
+            Event.type,
+            Event.cost,
+            Event.location_id,
+            Event.notes,
+        )
+        .filter(scope(Event.trip_id))
+        .order_by(Event.trip_id, Event.date, Event.start_time, Event.id)
+    )
+
+
+def _expenses(db: Session, scope: Scope) -> Query:
+    return (
+        db.query(
+            Expense.id,
+            Expense.trip_id,
+            Expense.spent_at_date,
+            Expense.description,
+            Expense.amount,
+            Expense.currency,
+            Expense.envelope_id,
+            BudgetEnvelope.category.label("category"),
+            Expense.event_id,
+        )
+        .outerjoin(BudgetEnvelope, BudgetEnvelope.id == Expense.envelope_id)
+        .filter(scope(Expense.trip_id))
+        .order_by(Expense.trip_id, Expense.spent_at_date, Expense.id)
+    )
+
+
+def _alerts(db: Session, scope: Scope) -> Query:
+    return (
+        db.query(WeatherAlert.id, WeatherAlert.trip_id, WeatherAlert.date, WeatherAlert.severity, WeatherAlert.summary)
+        .filter(scope(WeatherAlert.trip_id))
+        .order_by(WeatherAlert.trip_id, WeatherAlert.date)
+    )
+
+
+DATASETS: Dict[str, Dataset] = {
+    "events": Dataset("events", _events),
+    "expenses": Dataset("expenses", _expenses),
+    "alerts": Dataset("alerts", _alerts),
+}
+
+
+def _json_default(value: Any) -> str:
+    if isinstance(value, (date, time)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def encode_ndjson(columns: Tuple[str, ...], rows: Iterable[tuple], calendar_name: Optional[str]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(columns, row)), default=_json_default) + "\n"
+
+
+def encode_csv(columns: Tuple[str, ...], rows: Iterable[tuple], calendar_name: Optional[str]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def take(values) -> str:
+        writer.writerow(values)
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield take(columns)
+    for row in rows:
+        yield take(["" if value is None else value for value in row])
+
+
+def _ics_text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _ics_line(line: str) -> str:
+    """Fold a content line at 75 octets as RFC 5545 requires."""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split a multi-byte UTF-8 sequence.
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def encode_ics(columns: Tuple[str, ...], rows: Iterable[tuple], calendar_name: Optional[str]) -> Iterator[str]:
+    """Events as VEVENTs; timed events use floating local times, the rest are all-day."""
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "BEGIN:VCALENDAR\r\nVERSION:2.0\r\nPRODID:-//Trip Itinerary Planner//EN\r\nCALSCALE:GREGORIAN\r\n"
+    if calendar_name:
+        yield _ics_line(f"X-WR-CALNAME:{_ics_text(calendar_name)}")
+    for row in rows:
+        event = dict(zip(columns, row))
+        lines = ["BEGIN:VEVENT", f"UID:event-{event['id']}@trip-planner", f"DTSTAMP:{stamp}"]
+        if event["start_time"]:
+            lines.append(f"DTSTART:{datetime.combine(event['date'], event['start_time']):%Y%m%dT%H%M%S}")
+            if event["end_time"]:
+                lines.append(f"DTEND:{datetime.combine(event['date'], event['end_time']):%Y%m%dT%H%M%S}")
+        else:
+            lines.append(f"DTSTART;VALUE=DATE:{event['date']:%Y%m%d}")
+            lines.append(f"DTEND;VALUE=DATE:{event['date'] + timedelta(days=1):%Y%m%d}")
+        lines.append(f"SUMMARY:{_ics_text(event['title'])}")
+        lines.append(f"CATEGORIES:{_ics_text(event['type'])}")
+        if event["notes"]:
+            lines.append(f"DESCRIPTION:{_ics_text(event['notes'])}")
+        lines.append("END:VEVENT")
+        yield "".join(_ics_line(line) for line in lines)
+    yield "END:VCALENDAR\r\n"
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    media_type: str
+    encode: Callable[[Tuple[str, ...], Iterable[tuple], Optional[str]], Iterator[str]]
+    datasets: Optional[Tuple[str, ...]] = None  # None: every dataset
+
+    def supports(self, dataset: str) -> bool:
+        return self.datasets is None or dataset in self.datasets
+
+
+FORMATS: Dict[str, ExportFormat] = {
+    "ndjson": ExportFormat("application/x-ndjson", encode_ndjson),
+    "csv": ExportFormat("text/csv; charset=utf-8", encode_csv),
+    "ics": ExportFormat("text/calendar; charset=utf-8", encode_ics, datasets=("events",)),
+}
+
+
+def _chunked(parts: Iterable[str], chunk_size: int) -> Iterator[bytes]:
+    pending, size = [], 0
+    for part in parts:
+        data = part.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= chunk_size:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+def stream_export(dataset: str, fmt: str, scope: Scope, calendar_name: Optional[str] = None) -> Iterator[bytes]:
+    """Encode a dataset in a format, yielding byte chunks of about `export_chunk_size`."""
+    settings = get_settings()
+    source, encoder = DATASETS[dataset], FORMATS[fmt]
+    db = SessionLocal()
+    try:
+        query = source.query(db, scope)
+        columns = tuple(column["name"] for column in query.column_descriptions)
+        rows = query.yield_per(settings.export_yield_per)
+        yield from _chunked(encoder.encode(columns, rows, calendar_name), settings.export_chunk_size)
+    finally:
+        db.close()
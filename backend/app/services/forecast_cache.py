@@ -0,0 +1,52 @@
+"""Per-day forecast cache keyed by grid-rounded coordinates, shared across trips."""
+
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+from app.config import get_settings
+from app.services.ttl_cache import MISSING, TTLCache
+from app.services.weather_client import request_daily_forecast
+
+settings = get_settings()
+
+# Values are the summarised day dict, or None when the provider returned no data for that day
+# (e.g. beyond the forecast horizon) so it is not re-requested until the entry expires.
+_days = TTLCache(maxsize=settings.forecast_cache_size, ttl_seconds=settings.forecast_cache_ttl_seconds)
+
+
+def _grid(lat: float, lon: float) -> Tuple[float, float]:
+    return round(lat, settings.forecast_grid_decimals), round(lon, settings.forecast_grid_decimals)
+
+
+def _date_range(start_date: date, end_date: date) -> List[date]:
+    return [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+
+
+async def _fill(lat: float, lon: float, start_date: date, end_date: date) -> None:
+    daily = await request_daily_forecast(lat, lon, start_date, end_date)
+    by_day = {d["date"]: d for d in daily}
+    for day in _date_range(start_date, end_date):
+        _days.set((lat, lon, day), by_day.get(day))
+
+
+async def cached_daily_forecast(lat: float, lon: float, start_date: date, end_date: date) -> List[Dict]:
+    """Assemble a trip window from cached days, fetching only the span of days that are missing."""
+    lat, lon = _grid(lat, lon)
+    window = _date_range(start_date, end_date)
+
+    cached = {day: _days.get((lat, lon, day)) for day in window}
+    missing = [day for day, entry in cached.items() if entry is MISSING]
+    if missing:
+        try:
+            await _fill(lat, lon, missing[0], missing[-1])
+        except Exception:
+            # Serve whatever is cached; failed fetches are not cached and retry next time.
+            pass
+        for day in missing:
+            cached[day] = _days.get((lat, lon, day), None)
+
+    return [entry for entry in cached.values() if entry]
+
+
+def forecast_cache_stats() -> Dict[str, object]:
+    return {"memory": _days.stats()}
@@ -0,0 +1,87 @@
+"""Cached geocoding: in-process TTL/LRU layer with write-through to the geocode_cache table."""
+
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db import run_session
+from app.models import GeocodeEntry
+from app.services.ttl_cache import MISSING, TTLCache
+from app.services.weather_client import lookup_city
+
+settings = get_settings()
+
+_memory = TTLCache(maxsize=settings.geocode_cache_size, ttl_seconds=settings.geocode_cache_ttl_seconds)
+_counters: Dict[str, int] = {"store_hits": 0, "upstream_lookups": 0, "upstream_errors": 0}
+
+Coords = Optional[Tuple[float, float]]
+
+
+def _normalize(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _remember(key: str, coords: Coords) -> None:
+    ttl = settings.geocode_cache_ttl_seconds if coords else settings.geocode_negative_ttl_seconds
+    _memory.set(key, coords, ttl_seconds=ttl)
+
+
+def _load_entry(db: Session, key: str) -> Optional[GeocodeEntry]:
+    return db.query(GeocodeEntry).filter(GeocodeEntry.query == key).first()
+
+
+def _entry_is_fresh(entry: GeocodeEntry) -> bool:
+    # Coordinates of a place do not change; only misses are re-checked after the negative TTL.
+    if entry.latitude is not None and entry.longitude is not None:
+        return True
+    return entry.updated_at >= datetime.utcnow() - timedelta(seconds=settings.geocode_negative_ttl_seconds)
+
+
+def _store(db: Session, entry: Optional[GeocodeEntry], key: str, coords: Coords) -> None:
+    lat, lon = coords if coords else (None, None)
+    if entry is None:
+        db.add(GeocodeEntry(query=key, latitude=lat, longitude=lon, updated_at=datetime.utcnow()))
+    else:
+        entry.latitude, entry.longitude, entry.updated_at = lat, lon, datetime.utcnow()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another worker stored the same query first; its row is equivalent.
+        db.rollback()
+
+
+async def cached_geocode(db, name: str) -> Coords:
+    """Return (lat, lon) for `name`, consulting memory, then the database, then Open-Meteo.
+
+    `db` may be a sync `Session` or an `AsyncSession` (see `app.db.run_session`).
+    """
+    key = _normalize(name)
+    cached = _memory.get(key)
+    if cached is not MISSING:
+        return cached
+
+    entry = await run_session(db, _load_entry, key)
+    if entry is not None and _entry_is_fresh(entry):
+        _counters["store_hits"] += 1
+        coords = (entry.latitude, entry.longitude) if entry.latitude is not None else None
+        _remember(key, coords)
+        return coords
+
+    _counters["upstream_lookups"] += 1
+    try:
+        coords = await lookup_city(name)
+    except Exception:
+        # Transient provider failures are not cached so the next request retries.
+        _counters["upstream_errors"] += 1
+        return None
+
+    await run_session(db, _store, entry, key, coords)
+    _remember(key, coords)
+    return coords
+
+
+def geocode_cache_stats() -> Dict[str, object]:
+    return {"memory": _memory.stats(), **_counters}
@@ -0,0 +1,64 @@
+"""Shared outbound HTTP client used for all weather provider calls."""
+
+import asyncio
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import get_settings
+
+_client: Optional[httpx.AsyncClient] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+_host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+
+def _build_client() -> httpx.AsyncClient:
+    settings = get_settings()
+    limits = httpx.Limits(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+    )
+    return httpx.AsyncClient(timeout=settings.http_timeout_seconds, limits=limits, http2=settings.http2_enabled)
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the app-lifetime client, creating it lazily outside the FastAPI lifespan (CLI jobs)."""
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client.is_closed or _client_loop is not loop:
+        # Clients and semaphores are bound to the loop they were first used on.
+        _client = _build_client()
+        _client_loop = loop
+        _host_semaphores.clear()
+    return _client
+
+
+async def start_http_client() -> None:
+    get_http_client()
+
+
+async def close_http_client() -> None:
+    global _client, _client_loop
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+    _client_loop = None
+    _host_semaphores.clear()
+
+
+def _host_semaphore(url: str) -> asyncio.Semaphore:
+    host = urlsplit(url).hostname or ""
+    semaphore = _host_semaphores.get(host)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(get_settings().http_max_requests_per_host)
+        _host_semaphores[host] = semaphore
+    return semaphore
+
+
+async def get(url: str, params: Optional[dict] = None) -> httpx.Response:
+    """GET through the shared pool, capped at `http_max_requests_per_host` in-flight requests per host."""
+    client = get_http_client()
+    async with _host_semaphore(url):
+        return await client.get(url, params=params)
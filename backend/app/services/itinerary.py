@@ -0,0 +1,33 @@
+"""Set-based itinerary operations."""
+
+from sqlalchemy import func, insert, literal, select
+from sqlalchemy.orm import Session
+
+from app.models import Event
+
+# Columns copied verbatim when cloning; trip_id and date are rewritten.
+_CLONED_COLUMNS = ("location_id", "start_time", "end_time", "title", "type", "cost", "notes")
+
+
+def shifted_date(db: Session, column, days: int):
+    """SQL expression for `column` moved by `days` days, in the bound database's dialect."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        # SQLite stores dates as ISO text; date() applies the modifier and returns ISO text.
+        return func.date(column, f"{days:+d} days")
+    # PostgreSQL (and most others) add an integer number of days to a DATE.
+    return column + days
+
+
+def clone_itinerary(db: Session, source_trip_id: int, target_trip_id: int, day_offset: int) -> int:
+    """Copy every event of one trip into another with a single INSERT ... SELECT.
+
+    Returns the number of events created. The caller commits.
+    """
+    source = select(
+        literal(target_trip_id),
+        shifted_date(db, Event.date, day_offset),
+        *(getattr(Event, name) for name in _CLONED_COLUMNS),
+    ).where(Event.trip_id == source_trip_id)
+    stmt = insert(Event).from_select(["trip_id", "date", *_CLONED_COLUMNS], source)
+    return db.execute(stmt).rowcount
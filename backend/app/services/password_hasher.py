@@ -0,0 +1,56 @@
+"""Bounded worker pool for bcrypt hashing and verification."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from passlib.context import CryptContext
+
+T = TypeVar("T")
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should shed load rather than wait."""
+
+
+class PasswordHasher:
+    """Run CPU-heavy password work on a small dedicated pool with a hard queue-depth limit.
+
+    bcrypt releases the GIL, so a thread pool gives real parallelism without tying up the
+    threadpool FastAPI uses for every other sync route.
+    """
+
+    def __init__(self, context: CryptContext, workers: int, max_pending: int) -> None:
+        self.context = context
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def _submit(self, fn: Callable[..., T], *args: Any) -> T:
+        # Only touched from the event loop thread, so a plain counter is race-free.
+        if self._pending >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+            self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify_and_update(self, password: str, password_hash: str) -> Tuple[bool, Optional[str]]:
+        """Return (valid, new_hash); new_hash is set when the stored hash uses outdated cost settings."""
+        return await self._submit(self.context.verify_and_update, password, password_hash)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
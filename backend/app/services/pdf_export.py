@@ -0,0 +1,192 @@
+"""Trip PDF rendering with bounded memory.
+
+Rows are read through `yield_per` cursors as plain column tuples, so no ORM objects accumulate,
+and the document is written to a `SpooledTemporaryFile` that moves to disk once it outgrows
+`export_spool_max_bytes`. reportlab keeps page content until `save()`, so the first byte is only
+available after rendering finishes; page streams are compressed to keep that state small.
+
+Background export jobs instead take a `TripPdfSnapshot` of the rows, hash it to key the cached
+artifact, and render it in a worker process with `write_snapshot_pdf`.
+"""
+
+import hashlib
+import os
+from dataclasses import dataclass
+from datetime import date
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Iterable, Iterator, List, Tuple
+
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfgen import canvas
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.models import BudgetEnvelope, Event, Expense, Trip, WeatherAlert
+
+# Part of every content hash; bump it when the layout changes so cached artifacts are not reused.
+RENDERER_VERSION = "1"
+
+BOTTOM_MARGIN = 80
+TOP_MARGIN = 50
+
+
+class _PageWriter:
+    """Draws lines top to bottom, starting a new page when the current one is full."""
+
+    def __init__(self, out: BinaryIO):
+        self.canvas = canvas.Canvas(out, pagesize=letter, pageCompression=1)
+        self.width, self.height = letter
+        self.y = self.height - TOP_MARGIN
+
+    def line(self, text: str, x: int = 60, font: str = "Helvetica", size: int = 11, advance: int = 14) -> None:
+        self.canvas.setFont(font, size)
+        self.canvas.drawString(x, self.y, text)
+        self.y -= advance
+        if self.y < BOTTOM_MARGIN:
+            self.canvas.showPage()
+            self.y = self.height - TOP_MARGIN
+
+    def heading(self, text: str) -> None:
+        self.y -= 10
+        self.line(text, x=50, font="Helvetica-Bold", size=14, advance=18)
+
+    def save(self) -> None:
+        self.canvas.showPage()
+        self.canvas.save()
+
+
+TripHeader = Tuple[str, str, date, date]
+
+
+@dataclass
+class TripPdfSnapshot:
+    """Everything drawn into a trip PDF, as plain picklable rows."""
+
+    header: TripHeader
+    events: List[tuple]
+    envelopes: List[tuple]
+    alerts: List[tuple]
+
+    def content_hash(self) -> str:
+        """Digest of the rendered content; equal snapshots produce identical documents."""
+        digest = hashlib.sha256(RENDERER_VERSION.encode())
+        for section in (self.header, self.events, self.envelopes, self.alerts):
+            digest.update(repr(section).encode())
+        return digest.hexdigest()
+
+
+def _trip_header(trip: Trip) -> TripHeader:
+    return (trip.name, trip.destination, trip.start_date, trip.end_date)
+
+
+def _trip_rows(db: Session, trip_id: int) -> Tuple[Iterable[tuple], Iterable[tuple], Iterable[tuple]]:
+    batch = get_settings().export_yield_per
+    events = (
+        db.query(Event.date, Event.title, Event.type, Event.start_time)
+        .filter(Event.trip_id == trip_id)
+        .order_by(Event.date, Event.start_time, Event.id)
+        .yield_per(batch)
+    )
+    envelopes = (
+        db.query(BudgetEnvelope.category, BudgetEnvelope.planned_amount, func.coalesce(func.sum(Expense.amount), 0.0))
+        .outerjoin(Expense, Expense.envelope_id == BudgetEnvelope.id)
+        .filter(BudgetEnvelope.trip_id == trip_id)
+        .group_by(BudgetEnvelope.id, BudgetEnvelope.category, BudgetEnvelope.planned_amount)
+        .order_by(BudgetEnvelope.id)
+        .yield_per(batch)
+    )
+    alerts = (
+        db.query(WeatherAlert.date, WeatherAlert.severity, WeatherAlert.summary)
+        .filter(WeatherAlert.trip_id == trip_id)
+        .order_by(WeatherAlert.date)
+        .yield_per(batch)
+    )
+    return events, envelopes, alerts
+
+
+def draw_trip_pdf(
+    out: BinaryIO,
+    header: TripHeader,
+    events: Iterable[tuple],
+    envelopes: Iterable[tuple],
+    alerts: Iterable[tuple],
+) -> None:
+    """Draw the itinerary, budget and weather alerts of a trip as a PDF into `out`."""
+    name, destination, start_date, end_date = header
+    writer = _PageWriter(out)
+
+    writer.line(f"Trip: {name}", x=50, font="Helvetica-Bold", size=16, advance=20)
+    writer.line(f"Destination: {destination}", x=50, size=12, advance=15)
+    writer.line(f"Dates: {start_date} to {end_date}", x=50, size=12, advance=15)
+
+    writer.heading("Events")
+    for evt_date, title, evt_type, start_time in events:
+        line = f"{evt_date} - {title} ({evt_type})"
+        if start_time:
+            line += f" @ {start_time}"
+        writer.line(line)
+
+    writer.heading("Budget")
+    for category, planned, actual in envelopes:
+        writer.line(f"{category}: planned ${planned:.2f} / actual ${actual:.2f}")
+
+    for index, (alert_date, severity, summary) in enumerate(alerts):
+        if index == 0:
+            writer.heading("Weather Alerts")
+        writer.line(f"{alert_date} [{severity}] {summary}")
+
+    writer.save()
+
+
+def render_trip_pdf(db: Session, trip: Trip, out: BinaryIO) -> None:
+    """Stream a trip's rows from the database straight into a PDF written to `out`."""
+    draw_trip_pdf(out, _trip_header(trip), *_trip_rows(db, trip.id))
+
+
+def load_pdf_snapshot(db: Session, trip: Trip) -> TripPdfSnapshot:
+    """Read a trip's PDF content into memory, e.g. to hash it or hand it to another process."""
+    events, envelopes, alerts = _trip_rows(db, trip.id)
+    return TripPdfSnapshot(
+        header=_trip_header(trip),
+        events=[tuple(row) for row in events],
+        envelopes=[tuple(row) for row in envelopes],
+        alerts=[tuple(row) for row in alerts],
+    )
+
+
+def write_snapshot_pdf(snapshot: TripPdfSnapshot, path: str) -> str:
+    """Render a snapshot to `path` atomically. Runs in export worker processes."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as out:
+            draw_trip_pdf(out, snapshot.header, snapshot.events, snapshot.envelopes, snapshot.alerts)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def spooled_trip_pdf(db: Session, trip: Trip) -> SpooledTemporaryFile:
+    """Render a trip PDF into a spooled temporary file rewound to the start. The caller closes it."""
+    spool = SpooledTemporaryFile(max_size=get_settings().export_spool_max_bytes)
+    try:
+        render_trip_pdf(db, trip, spool)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+def iter_file(f: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    """Yield a file's remaining contents in chunks, closing it when done or abandoned."""
+    try:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        f.close()
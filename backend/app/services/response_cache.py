@@ -0,0 +1,199 @@
+"""Response cache for trip-scoped GETs with pluggable storage.
+
+Entries are keyed by trip id, trip version and the caller's role (plus the request path and
+query), so a version bump makes every older entry unreachable. Committed mutations also drop
+the trip's entries outright (see `app.services.trip_version`) so they do not linger until
+evicted. The in-process LRU is the default; `response_cache_backend="redis"` shares entries
+between workers through any Redis-compatible server.
+"""
+
+import json
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Optional, Set, Tuple
+
+from app.config import get_settings
+from app.services.ttl_cache import MISSING, TTLCache
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+@dataclass
+class CachedResponse:
+    body: bytes
+    headers: Dict[str, str]
+
+    def dumps(self) -> bytes:
+        # The header line is JSON and therefore contains no raw newline.
+        return json.dumps(self.headers).encode() + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedResponse":
+        headers, body = data.split(b"\n", 1)
+        return cls(body=body, headers=json.loads(headers))
+
+
+class MemoryBackend:
+    """Per-process LRU with a trip -> keys index for invalidation.
+
+    Entries are stored as (trip_id, data) so evicted or expired keys can be dropped from the
+    index too, keeping it no larger than the cache itself.
+    """
+
+    name = "memory"
+    blocking = False
+
+    def __init__(self, maxsize: int, ttl_seconds: int) -> None:
+        self._entries = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds, on_evict=self._forget)
+        self._by_trip: Dict[int, Set[str]] = defaultdict(set)
+        # Re-entrant: `set` holds it while the cache may call `_forget` for the entries it evicts.
+        self._lock = threading.RLock()
+
+    def _forget(self, key: str, value: Tuple[int, bytes]) -> None:
+        trip_id = value[0]
+        with self._lock:
+            keys = self._by_trip.get(trip_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_trip[trip_id]
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self._entries.get(key)
+        return None if value is MISSING else value[1]
+
+    def set(self, trip_id: int, key: str, value: bytes) -> None:
+        with self._lock:
+            self._entries.set(key, (trip_id, value))
+            self._by_trip[trip_id].add(key)
+
+    def invalidate_trip(self, trip_id: int) -> int:
+        with self._lock:
+            keys = self._by_trip.pop(trip_id, set())
+        for key in keys:
+            self._entries.pop(key)
+        return len(keys)
+
+    def size(self) -> int:
+        return self._entries.stats()["size"]
+
+
+class RedisBackend:
+    """Redis-compatible store; each trip keeps a set of its entry keys for invalidation.
+
+    Connection errors are logged and treated as misses so the API keeps serving from the database.
+    """
+
+    name = "redis"
+    blocking = True
+
+    def __init__(self, url: str, ttl_seconds: int, prefix: str = "trip-planner:response:") -> None:
+        import redis  # optional dependency, only needed for this backend
+
+        self._errors = (redis.RedisError,)
+        self._client = redis.Redis.from_url(url)
+        self._ttl = ttl_seconds
+        self._prefix = prefix
+
+    def _index(self, trip_id: int) -> str:
+        return f"{self._prefix}trip:{trip_id}:keys"
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.get(self._prefix + key)
+        except self._errors:
+            logger.warning("Response cache read failed", exc_info=True)
+            return None
+
+    def set(self, trip_id: int, key: str, value: bytes) -> None:
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            pipe.set(self._prefix + key, value, ex=self._ttl)
+            pipe.sadd(self._index(trip_id), self._prefix + key)
+            pipe.expire(self._index(trip_id), self._ttl)
+            pipe.execute()
+        except self._errors:
+            logger.warning("Response cache write failed", exc_info=True)
+
+    def invalidate_trip(self, trip_id: int) -> int:
+        index = self._index(trip_id)
+        try:
+            keys = self._client.smembers(index)
+            self._client.delete(index, *keys)
+            return len(keys)
+        except self._errors:
+            logger.warning("Response cache invalidation failed for trip %s", trip_id, exc_info=True)
+            return 0
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+def _build_backend():
+    if settings.response_cache_backend == "memory":
+        return MemoryBackend(settings.response_cache_size, settings.response_cache_ttl_seconds)
+    if settings.response_cache_backend == "redis":
+        if not settings.response_cache_redis_url:
+            raise RuntimeError("TRIP_PLANNER_RESPONSE_CACHE_REDIS_URL is required for the redis response cache")
+        return RedisBackend(settings.response_cache_redis_url, settings.response_cache_ttl_seconds)
+    return None
+
+
+_backend = _build_backend()
+_counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {"hits": 0, "misses": 0})
+_invalidations = {"trips": 0, "entries": 0}
+
+
+def enabled() -> bool:
+    return _backend is not None
+
+
+def blocking() -> bool:
+    """Whether lookups do network I/O, so async callers should run them off the event loop."""
+    return _backend is not None and _backend.blocking
+
+
+def get(resource: str, key: str) -> Optional[CachedResponse]:
+    if _backend is None:
+        return None
+    data = _backend.get(key)
+    counters = _counters[resource]
+    if data is None:
+        counters["misses"] += 1
+        return None
+    counters["hits"] += 1
+    return CachedResponse.loads(data)
+
+
+def put(trip_id: int, key: str, response: CachedResponse) -> None:
+    if _backend is not None:
+        _backend.set(trip_id, key, response.dumps())
+
+
+def invalidate_trip(trip_id: int) -> None:
+    if _backend is None:
+        return
+    _invalidations["trips"] += 1
+    _invalidations["entries"] += _backend.invalidate_trip(trip_id)
+
+
+def response_cache_stats() -> Dict[str, object]:
+    if _backend is None:
+        return {"backend": "none"}
+    resources = {}
+    for resource, counters in _counters.items():
+        total = counters["hits"] + counters["misses"]
+        resources[resource] = {**counters, "hit_ratio": round(counters["hits"] / total, 4) if total else 0.0}
+    hits = sum(c["hits"] for c in _counters.values())
+    total = hits + sum(c["misses"] for c in _counters.values())
+    return {
+        "backend": _backend.name,
+        "size": _backend.size(),
+        "hit_ratio": round(hits / total, 4) if total else 0.0,
+        "resources": resources,
+        "invalidations": dict(_invalidations),
+    }
@@ -0,0 +1,75 @@
+"""Request coalescing: concurrent identical async calls share one upstream execution."""
+
+import asyncio
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]") -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicate in-flight calls by key.
+
+    The first caller for a key starts the work; callers arriving before it finishes await the
+    same task and receive its result or exception. Nothing is cached once the task completes.
+    A cancelled waiter only detaches itself; the shared task is cancelled once no waiters remain.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executions = 0
+        self.shared = 0
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    async def do(self, key: Hashable, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(fn(*args, **kwargs)))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.executions += 1
+        else:
+            self.shared += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # Every waiter was cancelled; stop the upstream request and let the next caller start fresh.
+                self._forget(key, call)
+                call.task.cancel()
+
+    def stats(self) -> Dict[str, int]:
+        return {"executions": self.executions, "shared": self.shared, "inflight": len(self._calls)}
+
+
+_registry: Dict[str, SingleFlight] = {}
+
+
+def coalesced(fn: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Decorate an async function so concurrent calls with equal (hashable) arguments are merged."""
+    flight = _registry.setdefault(fn.__qualname__, SingleFlight())
+
+    @wraps(fn)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        key = (args, tuple(sorted(kwargs.items())))
+        return await flight.do(key, fn, *args, **kwargs)
+
+    return wrapper
+
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    return {name: flight.stats() for name, flight in _registry.items()}
@@ -0,0 +1,31 @@
+"""Per-trip version counter used for conditional GETs and response cache keys."""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import Trip
+from app.services import response_cache
+
+_BUMPED = "bumped_trip_ids"
+
+
+def bump_trip_version(db: Session, trip_id: int) -> None:
+    """Increment the trip's version in the caller's transaction.
+
+    Call this from every route that changes a trip or anything shown under it. The increment is
+    done in SQL so concurrent writers never lose a bump. Once the transaction commits, the
+    trip's cached responses are dropped.
+    """
+    db.query(Trip).filter(Trip.id == trip_id).update({Trip.version: Trip.version + 1}, synchronize_session=False)
+    db.info.setdefault(_BUMPED, set()).add(trip_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_bumped_trips(session: Session) -> None:
+    for trip_id in session.info.pop(_BUMPED, ()):
+        response_cache.invalidate_trip(trip_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_bumped_trips(session: Session) -> None:
+    session.info.pop(_BUMPED, None)
@@ -0,0 +1,78 @@
+"""Thread-safe in-process LRU cache with per-entry TTL and hit/miss counters."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU map whose entries expire after `ttl_seconds` (or a per-entry override).
+
+    `on_evict(key, value)` is called, outside the cache's lock, for entries dropped because they
+    expired or were pushed out by the LRU bound (not for `pop`/`clear`).
+    """
+
+    def __init__(
+        self, maxsize: int, ttl_seconds: float, on_evict: Optional[Callable[[Hashable, Any], None]] = None
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self.on_evict = on_evict
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Return the cached value or `default`; `None` is a valid cached value (negative caching)."""
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] > now:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return item[1]
+            self.misses += 1
+            if item is not None:
+                del self._data[key]
+        if item is not None:
+            self._evicted([(key, item[1])])
+        return default
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        evicted = []
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                old_key, (_, old_value) = self._data.popitem(last=False)
+                evicted.append((old_key, old_value))
+        self._evicted(evicted)
+
+    def _evicted(self, items: List[Tuple[Hashable, Any]]) -> None:
+        if self.on_evict is not None:
+            for key, value in items:
+                self.on_evict(key, value)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
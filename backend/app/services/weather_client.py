@@ -1,27 +1,35 @@
 from datetime import date
 from typing import Dict, List, Optional, Tuple
 
-import httpx
+from app.services import http_client
+from app.services.single_flight import coalesced
 
 
-async def geocode_city(name: str) -> Optional[Tuple[float, float]]:
+@coalesced
+async def lookup_city(name: str) -> Optional[Tuple[float, float]]:
+    """Resolve a place name; returns None when the provider has no match and raises on transport errors."""
     url = "https://geocoding-api.open-meteo.com/v1/search"
     params = {"name": name, "count": 1}
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            results = data.get("results") or []
-            if not results:
-                return None
-            first = results[0]
-            return float(first["latitude"]), float(first["longitude"])
-        except Exception:
-            return None
+    resp = await http_client.get(url, params=params)
+    resp.raise_for_status()
+    data = resp.json()
+    results = data.get("results") or []
+    if not results:
+        return None
+    first = results[0]
+    return float(first["latitude"]), float(first["longitude"])
 
 
-async def fetch_daily_forecast(lat: float, lon: float, start_date: date, end_date: date) -> List[Dict]:
+async def geocode_city(name: str) -> Optional[Tuple[float, float]]:
+    try:
+        return await lookup_city(name)
+    except Exception:
+        return None
+
+
+@coalesced
+async def request_daily_forecast(lat: float, lon: float, start_date: date, end_date: date) -> List[Dict]:
+    """Fetch and summarise the daily forecast; raises on transport or HTTP errors."""
     url = "https://api.open-meteo.com/v1/forecast"
     params = {
         "latitude": lat,
@@ -31,13 +39,9 @@ async def fetch_daily_forecast(lat: float, lon: float, start_date: date, end_dat
         "daily": "temperature_2m_max,temperature_2m_min,precipitation_probability_max",
         "timezone": "auto",
     }
-    async with httpx.AsyncClient(timeout=10) as client:
-        try:
-            resp = await client.get(url, params=params)
-            resp.raise_for_status()
-            daily = resp.json().get("daily", {})
-        except Exception:
-            return []
+    resp = await http_client.get(url, params=params)
+    resp.raise_for_status()
+    daily = resp.json().get("daily", {})
 
     dates = daily.get("time", [])
     tmax = daily.get("temperature_2m_max", [])
@@ -73,3 +77,10 @@ async def fetch_daily_forecast(lat: float, lon: float, start_date: date, end_dat
             }
         )
     return results
+
+
+async def fetch_daily_forecast(lat: float, lon: float, start_date: date, end_date: date) -> List[Dict]:
+    try:
+        return await request_daily_forecast(lat, lon, start_date, end_date)
+    except Exception:
+        return []
@@ -0,0 +1,176 @@
+"""Batch refresh of weather alerts for every upcoming trip.
+
+Run once from the command line with `python -m app.services.weather_refresh`, or periodically
+in-process by setting `TRIP_PLANNER_WEATHER_REFRESH_INTERVAL_MINUTES`.
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.db import SessionLocal, run_db
+from app.models import Location, Trip, TripDestination
+from app.services.weather_service import AlertUpsertResult, fetch_daily_weather, upsert_weather_alerts
+
+logger = logging.getLogger(__name__)
+
+# Open-Meteo serves at most 16 forecast days; later dates are rejected.
+FORECAST_HORIZON_DAYS = 16
+
+TripWindow = Tuple[int, date, date]
+
+
+@dataclass
+class RefreshStats:
+    trips: int = 0
+    locations: int = 0
+    failed_locations: int = 0
+    alerts_inserted: int = 0
+    alerts_updated: int = 0
+    load_seconds: float = 0.0
+    fetch_seconds: float = 0.0
+    persist_seconds: float = 0.0
+    total_seconds: float = 0.0
+
+
+def _load_upcoming_trips(db: Session, today: date, days_ahead: int) -> Dict[Tuple[float, float], List[TripWindow]]:
+    """Return trips that are under way or start within `days_ahead`, grouped by primary location."""
+    first_stop = (
+        db.query(TripDestination.trip_id, func.min(TripDestination.sort_order).label("sort_order"))
+        .group_by(TripDestination.trip_id)
+        .subquery()
+    )
+    rows = (
+        db.query(Trip.id, Trip.start_date, Trip.end_date, Location.latitude, Location.longitude)
+        .join(first_stop, first_stop.c.trip_id == Trip.id)
+        .join(
+            TripDestination,
+            and_(TripDestination.trip_id == Trip.id, TripDestination.sort_order == first_stop.c.sort_order),
+        )
+        .join(Location, Location.id == TripDestination.location_id)
+        .filter(
+            Trip.end_date >= today,
+            Trip.start_date <= today + timedelta(days=days_ahead),
+            Location.latitude.isnot(None),
+            Location.longitude.isnot(None),
+        )
+        .order_by(Trip.id, TripDestination.id)
+        .all()
+    )
+
+    decimals = get_settings().forecast_grid_decimals
+    groups: Dict[Tuple[float, float], List[TripWindow]] = defaultdict(list)
+    seen = set()
+    for trip_id, start_date, end_date, lat, lon in rows:
+        if trip_id in seen:
+            continue
+        seen.add(trip_id)
+        groups[(round(lat, decimals), round(lon, decimals))].append((trip_id, start_date, end_date))
+    return groups
+
+
+async def _fetch_group(
+    semaphore: asyncio.Semaphore, coords: Tuple[float, float], trips: List[TripWindow], today: date
+) -> Dict[date, dict]:
+    start = max(today, min(start for _, start, _ in trips))
+    end = min(today + timedelta(days=FORECAST_HORIZON_DAYS - 1), max(end for _, _, end in trips))
+    if start > end:
+        return {}
+    async with semaphore:
+        return await fetch_daily_weather(coords[0], coords[1], start, end)
+
+
+def _persist(groups: Dict[Tuple[float, float], List[TripWindow]], forecasts: Dict[Tuple[float, float], Dict[date, dict]]) -> AlertUpsertResult:
+    alerts_by_trip: Dict[int, Dict[date, dict]] = {}
+    for coords, daily in forecasts.items():
+        for trip_id, start_date, end_date in groups[coords]:
+            alerts_by_trip[trip_id] = {d: info for d, info in daily.items() if start_date <= d <= end_date}
+    db = SessionLocal()
+    try:
+        return upsert_weather_alerts(db, alerts_by_trip)
+    finally:
+        db.close()
+
+
+def _load(today: date, days_ahead: int) -> Dict[Tuple[float, float], List[TripWindow]]:
+    db = SessionLocal()
+    try:
+        return _load_upcoming_trips(db, today, days_ahead)
+    finally:
+        db.close()
+
+
+async def refresh_weather_alerts(days_ahead: Optional[int] = None, concurrency: Optional[int] = None) -> RefreshStats:
+    """Fetch each unique upcoming-trip location once and upsert the resulting alerts in bulk."""
+    settings = get_settings()
+    days_ahead = settings.weather_refresh_days_ahead if days_ahead is None else days_ahead
+    concurrency = settings.weather_refresh_concurrency if concurrency is None else concurrency
+    stats = RefreshStats()
+    started = time.perf_counter()
+    today = date.today()
+
+    groups = await run_db(_load, today, days_ahead)
+    stats.trips = sum(len(trips) for trips in groups.values())
+    stats.locations = len(groups)
+    stats.load_seconds = time.perf_counter() - started
+
+    fetch_started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    coords_list = list(groups)
+    results = await asyncio.gather(
+        *(_fetch_group(semaphore, coords, groups[coords], today) for coords in coords_list),
+        return_exceptions=True,
+    )
+    forecasts: Dict[Tuple[float, float], Dict[date, dict]] = {}
+    for coords, result in zip(coords_list, results):
+        if isinstance(result, BaseException):
+            stats.failed_locations += 1
+            logger.warning("Weather refresh failed for %s: %s", coords, result)
+        else:
+            forecasts[coords] = result
+    stats.fetch_seconds = time.perf_counter() - fetch_started
+
+    persist_started = time.perf_counter()
+    upserted = await run_db(_persist, groups, forecasts)
+    stats.alerts_inserted = upserted.inserted
+    stats.alerts_updated = upserted.updated
+    stats.persist_seconds = time.perf_counter() - persist_started
+    stats.total_seconds = time.perf_counter() - started
+    return stats
+
+
+async def run_periodic_refresh(interval_minutes: int) -> None:
+    """Refresh alerts forever, sleeping `interval_minutes` between runs; cancel the task to stop."""
+    while True:
+        try:
+            stats = await refresh_weather_alerts()
+            logger.info("Weather refresh finished: %s", asdict(stats))
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Weather refresh run failed")
+        await asyncio.sleep(interval_minutes * 60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Refresh weather alerts for upcoming trips.")
+    parser.add_argument("--days", type=int, default=None, help="Look-ahead window in days.")
+    parser.add_argument("--concurrency", type=int, default=None, help="Maximum concurrent provider requests.")
+    args = parser.parse_args()
+
+    stats = asyncio.run(refresh_weather_alerts(days_ahead=args.days, concurrency=args.concurrency))
+    for field, value in asdict(stats).items():
+        print(f"{field}: {round(value, 3) if isinstance(value, float) else value}")
+
+
+if __name__ == "__main__":
+    main()
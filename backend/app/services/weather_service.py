@@ -1,12 +1,16 @@
+from dataclasses import dataclass
 from datetime import date
-from typing import Dict, List
+from typing import Dict
 
-import httpx
 from sqlalchemy.orm import Session
 
+from app.db import dialect_insert, run_session
 from app.models import Location, Trip, TripDestination, WeatherAlert
+from app.services import http_client
+from app.services.single_flight import coalesced
 
 
+@coalesced
 async def fetch_daily_weather(lat: float, lon: float, start_date: date, end_date: date) -> Dict[date, dict]:
     url = "https://api.open-meteo.com/v1/forecast"
     params = {
@@ -17,10 +21,9 @@ async def fetch_daily_weather(lat: float, lon: float, start_date: date, end_date
         "daily": ["precipitation_sum", "precipitation_probability_max", "windspeed_10m_max", "temperature_2m_max"],
         "timezone": "UTC",
     }
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get(url, params=params)
-        resp.raise_for_status()
-        data = resp.json().get("daily", {})
+    resp = await http_client.get(url, params=params)
+    resp.raise_for_status()
+    data = resp.json().get("daily", {})
 
     dates = data.get("time", [])
     precip = data.get("precipitation_sum", [])
@@ -63,29 +66,73 @@ def _primary_location_for_trip(trip: Trip) -> Location | None:
     return None
 
 
-async def build_weather_alerts_for_trip(trip: Trip, db: Session) -> List[WeatherAlert]:
-    location = _primary_location_for_trip(trip)
-    if not location or location.latitude is None or location.longitude is None:
-        return []
+def _load_primary_location(db: Session, trip: Trip) -> Location | None:
+    return _primary_location_for_trip(trip)
 
-    daily = await fetch_daily_weather(location.latitude, location.longitude, trip.start_date, trip.end_date)
-    alerts: List[WeatherAlert] = []
-    for d, info in daily.items():
-        severity = info["severity"]
-        if severity == "low":
-            continue
-        alert = (
-            db.query(WeatherAlert)
-            .filter(WeatherAlert.trip_id == trip.id, WeatherAlert.date == d)
-            .first()
+
+@dataclass
+class AlertUpsertResult:
+    inserted: int = 0
+    updated: int = 0
+
+
+def upsert_weather_alerts(db: Session, alerts_by_trip: Dict[int, Dict[date, dict]]) -> AlertUpsertResult:
+    """Insert or update non-low alerts for many trips in one statement keyed on (trip_id, date)."""
+    rows = [
+        {
+            "trip_id": trip_id,
+            "date": d,
+            "severity": info["severity"],
+            "summary": info["summary"],
+            "provider_payload": info["raw"],
+        }
+        for trip_id, daily in alerts_by_trip.items()
+        for d, info in daily.items()
+        if info["severity"] != "low"
+    ]
+    if not rows:
+        return AlertUpsertResult()
+
+    days = [row["date"] for row in rows]
+    existing = set(
+        db.query(WeatherAlert.trip_id, WeatherAlert.date).filter(
+            WeatherAlert.trip_id.in_(alerts_by_trip.keys()),
+            WeatherAlert.date >= min(days),
+            WeatherAlert.date <= max(days),
         )
-        if not alert:
-            alert = WeatherAlert(trip_id=trip.id, date=d, severity=severity, summary=info["summary"], provider_payload=info["raw"])
-            db.add(alert)
-        else:
-            alert.severity = severity
-            alert.summary = info["summary"]
-            alert.provider_payload = info["raw"]
-        alerts.append(alert)
+    )
+    result = AlertUpsertResult()
+    result.updated = sum(1 for row in rows if (row["trip_id"], row["date"]) in existing)
+    result.inserted = len(rows) - result.updated
+
+    insert = dialect_insert(db)
+    if insert is not None:
+        stmt = insert(WeatherAlert)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WeatherAlert.trip_id, WeatherAlert.date],
+            set_={
+                "severity": stmt.excluded.severity,
+                "summary": stmt.excluded.summary,
+                "provider_payload": stmt.excluded.provider_payload,
+            },
+        )
+        db.execute(stmt, rows)
+    else:
+        for row in rows:
+            if (row["trip_id"], row["date"]) in existing:
+                db.query(WeatherAlert).filter(
+                    WeatherAlert.trip_id == row["trip_id"], WeatherAlert.date == row["date"]
+                ).update({k: row[k] for k in ("severity", "summary", "provider_payload")}, synchronize_session=False)
+            else:
+                db.add(WeatherAlert(**row))
     db.commit()
-    return alerts
+    return result
+
+
+async def build_weather_alerts_for_trip(trip: Trip, db) -> AlertUpsertResult:
+    location = await run_session(db, _load_primary_location, trip)
+    if not location or location.latitude is None or location.longitude is None:
+        return AlertUpsertResult()
+
+    daily = await fetch_daily_weather(location.latitude, location.longitude, trip.start_date, trip.end_date)
+    return await run_session(db, upsert_weather_alerts, {trip.id: daily})
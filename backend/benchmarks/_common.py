@@ -0,0 +1,179 @@
+"""Shared helpers for the benchmark scripts.
+
+Each benchmark drives the ASGI app in-process through `httpx.ASGITransport`, so it measures the
+application and database work without a network hop or an external server. Results are relative:
+compare runs on the same machine and database, e.g. with and without a setting.
+
+The database defaults to a throwaway SQLite file; set TRIP_PLANNER_DATABASE_URL to a migrated
+database (e.g. a local Postgres) for numbers closer to production.
+"""
+
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date, time as time_of_day, timedelta
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+if "TRIP_PLANNER_DATABASE_URL" not in os.environ:
+    os.environ["TRIP_PLANNER_DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='trip-planner-bench-')}/bench.db"
+
+import httpx
+from sqlalchemy import insert
+
+from app.db import SessionLocal, engine
+from app.main import app
+from app.models import Base, BudgetEnvelope, Event, Expense, WeatherAlert
+from app.services.budget_rollups import rebuild
+
+Base.metadata.create_all(engine)
+
+
+@asynccontextmanager
+async def app_client() -> AsyncIterator[httpx.AsyncClient]:
+    """An HTTP client bound to the app, with its lifespan (pools, background tasks) running."""
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            yield client
+
+
+async def register(client: httpx.AsyncClient, password: str = "bench-password") -> Dict[str, str]:
+    """Register a fresh user and return its email, password and bearer auth headers."""
+    name = f"bench-{uuid.uuid4().hex[:10]}"
+    email = f"{name}@example.com"
+    response = await client.post("/auth/register", json={"email": email, "username": name, "password": password})
+    response.raise_for_status()
+    response = await client.post("/auth/login", json={"email": email, "password": password})
+    response.raise_for_status()
+    return {"email": email, "password": password, "Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def auth_headers(user: Dict[str, str]) -> Dict[str, str]:
+    return {"Authorization": user["Authorization"]}
+
+
+async def create_trip(client: httpx.AsyncClient, user: Dict[str, str], days: int = 7) -> dict:
+    start = date.today() + timedelta(days=7)
+    payload = {"name": "Bench trip", "destination": "New York", "start_date": str(start), "end_date": str(start + timedelta(days=days))}
+    response = await client.post("/trips", json=payload, headers=auth_headers(user))
+    response.raise_for_status()
+    return response.json()
+
+
+def seed_trip_rows(
+    trip_id: int, start: date, days: int, events: int = 0, envelopes: int = 0, expenses: int = 0, alerts: int = 0
+) -> None:
+    """Bulk-insert synthetic rows under a trip (much faster than the API) and rebuild its rollups."""
+    db = SessionLocal()
+    try:
+        categories = [f"category-{i}" for i in range(envelopes)]
+        if envelopes:
+            db.execute(
+                insert(BudgetEnvelope),
+                [{"trip_id": trip_id, "category": c, "planned_amount": 500.0} for c in categories],
+            )
+        envelope_ids = [row[0] for row in db.query(BudgetEnvelope.id).filter(BudgetEnvelope.trip_id == trip_id)]
+        batch = 5000
+        for offset in range(0, events, batch):
+            db.execute(
+                insert(Event),
+                [
+                    {
+                        "trip_id": trip_id,
+                        "date": start + timedelta(days=i % days),
+                        "start_time": time_of_day(8 + i % 12, 0) if i % 3 else None,
+                        "title": f"Event {i}",
+                        "type": "activity",
+                    }
+                    for i in range(offset, min(offset + batch, events))
+                ],
+            )
+        for offset in range(0, expenses, batch):
+            db.execute(
+                insert(Expense),
+                [
+                    {
+                        "trip_id": trip_id,
+                        # Every fifth expense is uncategorized.
+                        "envelope_id": envelope_ids[i % len(envelope_ids)] if envelope_ids and i % 5 else None,
+                        "description": f"Expense {i}",
+                        "amount": float(i % 97) + 0.5,
+                        "currency": "USD",
+                        "spent_at_date": start + timedelta(days=i % days),
+                    }
+                    for i in range(offset, min(offset + batch, expenses))
+                ],
+            )
+        if alerts:
+            db.execute(
+                insert(WeatherAlert),
+                [
+                    {"trip_id": trip_id, "date": start + timedelta(days=i), "severity": "warning", "summary": f"Alert {i}"}
+                    for i in range(min(alerts, days))
+                ],
+            )
+        db.commit()
+        rebuild(db, trip_id)
+    finally:
+        db.close()
+
+
+async def run_load(
+    call: Callable[[], Awaitable[httpx.Response]],
+    concurrency: int,
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+) -> "LoadResult":
+    """Run `call` from `concurrency` workers until `requests` calls or `duration` seconds are done."""
+    latencies: List[float] = []
+    errors: Dict[int, int] = {}
+    issued = 0
+    started = time.perf_counter()
+    deadline = started + duration if duration else None
+
+    async def worker() -> None:
+        nonlocal issued
+        while True:
+            if requests is not None and issued >= requests:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+            issued += 1
+            t0 = time.perf_counter()
+            response = await call()
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code >= 400:
+                errors[response.status_code] = errors.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return LoadResult(latencies, time.perf_counter() - started, errors)
+
+
+class LoadResult:
+    def __init__(self, latencies: List[float], elapsed: float, errors: Dict[int, int]) -> None:
+        self.latencies = sorted(latencies)
+        self.elapsed = elapsed
+        self.errors = errors
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return 0.0
+        index = min(len(self.latencies) - 1, int(round(p / 100 * (len(self.latencies) - 1))))
+        return self.latencies[index]
+
+    def report(self, label: str) -> str:
+        count = len(self.latencies)
+        rate = count / self.elapsed if self.elapsed else 0.0
+        mean = statistics.fmean(self.latencies) if self.latencies else 0.0
+        line = (
+            f"{label:<32} n={count:<6} {rate:8.1f} req/s  mean={mean * 1000:7.2f}ms  "
+            f"p50={self.percentile(50) * 1000:7.2f}ms  p95={self.percentile(95) * 1000:7.2f}ms  "
+            f"max={self.percentile(100) * 1000:7.2f}ms"
+        )
+        if self.errors:
+            line += f"  errors={self.errors}"
+        return line
@@ -0,0 +1,77 @@
+"""GET /trips/{id}/budget on a trip with many expenses, against the old Python-side summary.
+
+    python -m benchmarks.budget_summary [--expenses 10000] [--envelopes 12] [--iterations 20]
+
+The response cache is off by default here (TRIP_PLANNER_RESPONSE_CACHE_BACKEND=none) so every
+request does the database work. "python-side" replays the original implementation: load every
+envelope and expense, then sum per category through `expense.envelope`. It stops before
+serialising anything, so it understates the original endpoint's cost.
+"""
+
+import os
+
+os.environ.setdefault("TRIP_PLANNER_RESPONSE_CACHE_BACKEND", "none")
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+from datetime import date
+
+from benchmarks._common import LoadResult, app_client, auth_headers, create_trip, register, run_load, seed_trip_rows
+from app.db import SessionLocal
+from app.models import BudgetEnvelope, Expense
+
+
+def _python_side_summary(trip_id: int) -> None:
+    db = SessionLocal()
+    try:
+        envelopes = db.query(BudgetEnvelope).filter(BudgetEnvelope.trip_id == trip_id).all()
+        expenses = db.query(Expense).filter(Expense.trip_id == trip_id).all()
+        planned, actual = defaultdict(float), defaultdict(float)
+        for env in envelopes:
+            planned[env.category] += env.planned_amount
+        for exp in expenses:
+            actual[exp.envelope.category if exp.envelope else "uncategorized"] += exp.amount
+    finally:
+        db.close()
+
+
+def _time_sync(fn, iterations: int) -> LoadResult:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    return LoadResult(latencies, time.perf_counter() - started, {})
+
+
+async def main(expenses: int, envelopes: int, iterations: int) -> None:
+    async with app_client() as client:
+        user = await register(client)
+        headers = auth_headers(user)
+        trip = await create_trip(client, user, days=14)
+        trip_id = trip["id"]
+        seed_trip_rows(trip_id, date.fromisoformat(trip["start_date"]), days=14, envelopes=envelopes, expenses=expenses)
+
+        variants = {
+            "totals only": f"/trips/{trip_id}/budget?include_expenses=false",
+            "first page of 100": f"/trips/{trip_id}/budget?expense_limit=100",
+            "all expenses": f"/trips/{trip_id}/budget",
+        }
+        print(f"expenses={expenses} envelopes={envelopes} iterations={iterations}")
+        for label, url in variants.items():
+            result = await run_load(lambda: client.get(url, headers=headers), concurrency=1, requests=iterations)
+            print(result.report(label))
+
+    print(_time_sync(lambda: _python_side_summary(trip_id), iterations).report("python-side (original)"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=10_000)
+    parser.add_argument("--envelopes", type=int, default=12)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.expenses, args.envelopes, args.iterations))
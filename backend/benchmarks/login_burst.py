@@ -0,0 +1,66 @@
+"""Login burst latency, and what a burst does to the rest of the API.
+
+    python -m benchmarks.login_burst [--users 8] [--burst 100] [--concurrency 100] [--probe-rps 50]
+
+`--burst` logins are fired from `--concurrency` clients at once while a probe calls GET /health
+(a plain `def` route served by FastAPI's threadpool) at `--probe-rps`. Logins over the hasher's
+queue limit are shed with 503, which is reported separately. The bcrypt pool is sized by
+TRIP_PLANNER_PASSWORD_HASH_WORKERS and TRIP_PLANNER_PASSWORD_HASH_MAX_PENDING.
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+
+from benchmarks._common import LoadResult, app_client, register, run_load
+
+
+async def _probe(client, stop: asyncio.Event, rps: float) -> LoadResult:
+    latencies, errors = [], {}
+    started = time.perf_counter()
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        response = await client.get("/health")
+        latencies.append(time.perf_counter() - t0)
+        if response.status_code >= 400:
+            errors[response.status_code] = errors.get(response.status_code, 0) + 1
+        await asyncio.sleep(max(0.0, 1 / rps - (time.perf_counter() - t0)))
+    return LoadResult(latencies, time.perf_counter() - started, errors)
+
+
+async def main(users: int, burst: int, concurrency: int, probe_rps: float) -> None:
+    async with app_client() as client:
+        accounts = [await register(client) for _ in range(users)]
+        credentials = itertools.cycle({"email": a["email"], "password": a["password"]} for a in accounts)
+
+        baseline_stop = asyncio.Event()
+        baseline_task = asyncio.create_task(_probe(client, baseline_stop, probe_rps))
+        await asyncio.sleep(1.0)
+        baseline_stop.set()
+        baseline = await baseline_task
+
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, stop, probe_rps))
+        result = await run_load(lambda: client.post("/auth/login", json=next(credentials)), concurrency, requests=burst)
+        stop.set()
+        during = await probe
+
+        stats = (await client.get("/metrics")).json().get("auth_cache", {}).get("password_hasher")
+
+    print(f"users={users} burst={burst} concurrency={concurrency} probe={probe_rps}/s")
+    print(result.report("POST /auth/login"))
+    print(baseline.report("GET /health (idle)"))
+    print(during.report("GET /health (during burst)"))
+    if stats:
+        print(f"password hasher: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=8)
+    parser.add_argument("--burst", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--probe-rps", type=float, default=50.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.burst, args.concurrency, args.probe_rps))
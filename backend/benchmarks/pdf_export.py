@@ -0,0 +1,104 @@
+"""Time and Python heap peak of trip PDF rendering, against the original in-memory approach.
+
+    python -m benchmarks.pdf_export [--events 20000] [--expenses 10000] [--envelopes 12]
+
+"streaming" is the export route's path: `yield_per` column cursors rendered into a spooled
+temporary file. "in-memory (original)" replays the previous implementation: every row loaded as
+an ORM object with `.all()`, per-envelope actuals summed in Python, and the document built in a
+`BytesIO`. Peaks come from tracemalloc, so they cover Python allocations (reportlab included)
+but not the database driver's C buffers. The endpoint itself is timed through the app as well.
+"""
+
+import argparse
+import asyncio
+import io
+import time
+import tracemalloc
+from datetime import date
+from typing import Callable, Tuple
+
+from benchmarks._common import app_client, auth_headers, create_trip, register, seed_trip_rows
+from app.db import SessionLocal
+from app.models import BudgetEnvelope, Event, Expense, Trip, WeatherAlert
+from app.services.pdf_export import draw_trip_pdf, spooled_trip_pdf
+
+
+def _streaming(trip_id: int) -> int:
+    db = SessionLocal()
+    try:
+        trip = db.get(Trip, trip_id)
+        with spooled_trip_pdf(db, trip) as spool:
+            spool.seek(0, io.SEEK_END)
+            return spool.tell()
+    finally:
+        db.close()
+
+
+def _in_memory(trip_id: int) -> int:
+    db = SessionLocal()
+    try:
+        trip = db.get(Trip, trip_id)
+        events = db.query(Event).filter(Event.trip_id == trip_id).order_by(Event.date, Event.start_time).all()
+        envelopes = db.query(BudgetEnvelope).filter(BudgetEnvelope.trip_id == trip_id).all()
+        expenses = db.query(Expense).filter(Expense.trip_id == trip_id).all()
+        alerts = db.query(WeatherAlert).filter(WeatherAlert.trip_id == trip_id).order_by(WeatherAlert.date).all()
+        out = io.BytesIO()
+        draw_trip_pdf(
+            out,
+            (trip.name, trip.destination, trip.start_date, trip.end_date),
+            [(e.date, e.title, e.type, e.start_time) for e in events],
+            [
+                (env.category, env.planned_amount, sum(x.amount for x in expenses if x.envelope_id == env.id))
+                for env in envelopes
+            ],
+            [(a.date, a.severity, a.summary) for a in alerts],
+        )
+        return len(out.getvalue())
+    finally:
+        db.close()
+
+
+def _measure(fn: Callable[[int], int], trip_id: int) -> Tuple[float, int, int]:
+    """Time an untraced run, then take the heap peak from a second, traced run (tracing is slow)."""
+    started = time.perf_counter()
+    size = fn(trip_id)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    try:
+        fn(trip_id)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return elapsed, peak, size
+
+
+async def main(events: int, expenses: int, envelopes: int) -> None:
+    async with app_client() as client:
+        user = await register(client)
+        headers = auth_headers(user)
+        trip = await create_trip(client, user, days=14)
+        trip_id = trip["id"]
+        seed_trip_rows(
+            trip_id, date.fromisoformat(trip["start_date"]), days=14,
+            events=events, envelopes=envelopes, expenses=expenses, alerts=14,
+        )
+
+        started = time.perf_counter()
+        response = await client.get(f"/trips/{trip_id}/export/pdf", headers=headers)
+        response.raise_for_status()
+        endpoint_elapsed = time.perf_counter() - started
+
+    print(f"events={events} expenses={expenses} envelopes={envelopes}")
+    for label, fn in (("streaming", _streaming), ("in-memory (original)", _in_memory)):
+        elapsed, peak, size = _measure(fn, trip_id)
+        print(f"{label:<32} time={elapsed * 1000:8.1f}ms  heap peak={peak / 2**20:7.1f}MiB  pdf={size / 2**20:6.2f}MiB")
+    print(f"{'GET /trips/{id}/export/pdf':<32} time={endpoint_elapsed * 1000:8.1f}ms  bytes={len(response.content)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--expenses", type=int, default=10_000)
+    parser.add_argument("--envelopes", type=int, default=12)
+    args = parser.parse_args()
+    asyncio.run(main(args.events, args.expenses, args.envelopes))
@@ -0,0 +1,52 @@
+"""Requests/sec for the trip read endpoints under concurrent load.
+
+    python -m benchmarks.read_throughput [--concurrency 32] [--duration 10] [--events 200]
+
+Run it with and without TRIP_PLANNER_ASYNC_DB_ENABLED=true to compare the async and threadpool
+paths, and with TRIP_PLANNER_RESPONSE_CACHE_BACKEND=none to take the response cache out of the
+picture. The trip's version is bumped before each endpoint so its first request is a cache miss.
+"""
+
+import argparse
+import asyncio
+from datetime import date, timedelta
+
+from benchmarks._common import app_client, auth_headers, create_trip, register, run_load
+
+
+async def main(concurrency: int, duration: float, events: int) -> None:
+    async with app_client() as client:
+        user = await register(client)
+        headers = auth_headers(user)
+        trip = await create_trip(client, user)
+        trip_id = trip["id"]
+        start = date.fromisoformat(trip["start_date"])
+        for i in range(events):
+            payload = {"trip_id": trip_id, "date": str(start + timedelta(days=i % 7)), "title": f"Event {i}", "type": "activity"}
+            (await client.post(f"/trips/{trip_id}/events", json=payload, headers=headers)).raise_for_status()
+        for name in ("Central Park", "Brooklyn Bridge"):
+            payload = {"name": name, "type": "landmark"}
+            (await client.post(f"/trips/{trip_id}/destinations", json=payload, headers=headers)).raise_for_status()
+
+        endpoints = {
+            "GET /trips": "/trips",
+            "GET /trips/{id}": f"/trips/{trip_id}",
+            "GET /trips/{id}/members": f"/trips/{trip_id}/members",
+            "GET /trips/{id}/events": f"/trips/{trip_id}/events",
+            "GET /trips/{id}/destinations": f"/trips/{trip_id}/destinations",
+            "GET /trips/{id}/budget": f"/trips/{trip_id}/budget",
+        }
+        print(f"concurrency={concurrency} duration={duration}s events={events}")
+        for label, url in endpoints.items():
+            await client.patch(f"/trips/{trip_id}", json={"name": "Bench trip"}, headers=headers)
+            result = await run_load(lambda: client.get(url, headers=headers), concurrency, duration=duration)
+            print(result.report(label))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--events", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.duration, args.events))
@@ -0,0 +1,83 @@
+"""Concurrent GET /trips/{id}/weather with a simulated Open-Meteo, plus event-loop lag.
+
+    python -m benchmarks.weather_concurrency [--concurrency 64] [--requests 2000] [--trips 20] [--api-latency-ms 50]
+
+Open-Meteo is replaced by an in-process mock that answers after `--api-latency-ms`, so the run is
+repeatable and offline. While the load runs, a probe task sleeps 5ms at a time and records how late
+it wakes up: blocking database work on the event loop shows up directly as probe lag. Run it with
+and without TRIP_PLANNER_ASYNC_DB_ENABLED=true to compare the async engine with the DB thread pool.
+"""
+
+import argparse
+import asyncio
+import itertools
+import time
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks._common import app_client, auth_headers, create_trip, register, run_load
+from app.services import http_client
+
+PROBE_INTERVAL = 0.005
+
+
+def _mock_open_meteo(latency: float) -> httpx.AsyncClient:
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(latency)
+        if "geocoding" in request.url.host:
+            return httpx.Response(200, json={"results": [{"latitude": 40.71, "longitude": -74.0}]})
+        start = date.fromisoformat(request.url.params["start_date"])
+        end = date.fromisoformat(request.url.params["end_date"])
+        days = [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+        n = len(days)
+        daily = {
+            "time": days,
+            "temperature_2m_max": [31.0] * n,
+            "temperature_2m_min": [20.0] * n,
+            "precipitation_probability_max": [70] * n,
+            "precipitation_sum": [12.0] * n,
+            "windspeed_10m_max": [20.0] * n,
+        }
+        return httpx.Response(200, json={"daily": daily})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def _probe(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        lags.append(time.perf_counter() - t0 - PROBE_INTERVAL)
+
+
+async def main(concurrency: int, requests: int, trips: int, api_latency_ms: float) -> None:
+    http_client._build_client = lambda: _mock_open_meteo(api_latency_ms / 1000)
+    async with app_client() as client:
+        user = await register(client)
+        headers = auth_headers(user)
+        trip_ids = [(await create_trip(client, user))["id"] for _ in range(trips)]
+        urls = itertools.cycle(f"/trips/{trip_id}/weather" for trip_id in trip_ids)
+
+        stop, lags = asyncio.Event(), []
+        probe = asyncio.create_task(_probe(stop, lags))
+        result = await run_load(lambda: client.get(next(urls), headers=headers), concurrency, requests=requests)
+        stop.set()
+        await probe
+
+    lags.sort()
+    print(f"concurrency={concurrency} requests={requests} trips={trips} api_latency={api_latency_ms}ms")
+    print(result.report("GET /trips/{id}/weather"))
+    if lags:
+        p95 = lags[int(0.95 * (len(lags) - 1))]
+        print(f"{'event loop lag':<32} samples={len(lags)}  p95={p95 * 1000:7.2f}ms  max={lags[-1] * 1000:7.2f}ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--trips", type=int, default=20)
+    parser.add_argument("--api-latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.requests, args.trips, args.api_latency_ms))
@@ -0,0 +1,74 @@
+"""Test fixtures: the app on a throwaway SQLite database and a statement counter."""
+
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Callable, Iterator, List, Tuple
+
+# Settings are read at import time, so point the app at its own database before importing it.
+os.environ["TRIP_PLANNER_DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='trip-planner-tests-')}/test.db"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.db import engine
+from app.main import app
+from app.models import Base
+
+
+@pytest.fixture(scope="session")
+def client() -> Iterator[TestClient]:
+    Base.metadata.create_all(engine)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def make_user(client: TestClient) -> Callable[[], Tuple[dict, dict]]:
+    """Register a fresh user and return it with its bearer headers."""
+
+    def register() -> Tuple[dict, dict]:
+        name = uuid.uuid4().hex[:12]
+        email = f"{name}@example.com"
+        user = client.post("/auth/register", json={"email": email, "username": name, "password": "pw"}).json()
+        token = client.post("/auth/login", json={"email": email, "password": "pw"}).json()["access_token"]
+        return user, {"Authorization": f"Bearer {token}"}
+
+    return register
+
+
+@pytest.fixture
+def auth_headers(make_user) -> dict:
+    return make_user()[1]
+
+
+@pytest.fixture
+def trip(client: TestClient, auth_headers: dict) -> dict:
+    today = date.today()
+    payload = {"name": "Test trip", "destination": "NYC", "start_date": str(today), "end_date": str(today + timedelta(days=3))}
+    response = client.post("/trips", json=payload, headers=auth_headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+@pytest.fixture
+def count_queries():
+    """Context manager collecting the SQL statements executed inside it."""
+
+    @contextmanager
+    def counting() -> Iterator[List[str]]:
+        statements: List[str] = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return counting
@@ -0,0 +1,36 @@
+"""Bulk expense import: line splitting and the per-line size guard."""
+
+import json
+from datetime import date
+
+from app.services.expense_import import MAX_LINE_BYTES
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def _row(description: str) -> str:
+    return json.dumps({"description": description, "amount": 3.5, "spent_at_date": str(date.today())}, ensure_ascii=False)
+
+
+def test_line_limit_counts_bytes_not_characters(client, auth_headers, trip):
+    # Three UTF-8 bytes per character: under the limit in characters, over it in bytes.
+    description = "€" * (MAX_LINE_BYTES // 3 + 100)
+    assert len(_row(description)) < MAX_LINE_BYTES < len(_row(description).encode())
+
+    response = client.post(
+        f"/trips/{trip['id']}/expenses:bulk",
+        content=(_row(description) + "\n").encode(),
+        headers={**auth_headers, **NDJSON},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"Line 1 exceeds {MAX_LINE_BYTES} bytes"
+
+
+def test_multibyte_rows_and_bom_are_imported(client, auth_headers, trip):
+    body = "﻿" + "\r\n".join([_row("Café crème"), "", _row("Ramen 🍜")])
+    response = client.post(f"/trips/{trip['id']}/expenses:bulk", content=body.encode(), headers={**auth_headers, **NDJSON})
+    assert response.status_code == 200, response.text
+    assert response.json()["inserted"] == 2
+
+    summary = client.get(f"/trips/{trip['id']}/budget", headers=auth_headers).json()
+    assert {expense["description"] for expense in summary["expenses"]} == {"Café crème", "Ramen 🍜"}
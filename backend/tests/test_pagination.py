@@ -0,0 +1,57 @@
+"""List endpoints stay unpaged for callers that send neither `limit` nor `cursor`."""
+
+from datetime import date, timedelta
+
+from app.routers.events import EVENTS_PAGE_SIZE
+from app.routers.trips import TRIPS_PAGE_SIZE
+
+
+def test_trips_unpaged_without_limit_or_cursor(client, auth_headers):
+    start = date.today()
+    for offset in range(TRIPS_PAGE_SIZE + 5):
+        day = str(start + timedelta(days=offset))
+        payload = {"name": f"Trip {offset}", "destination": "NYC", "start_date": day, "end_date": day}
+        assert client.post("/trips", json=payload, headers=auth_headers).status_code == 201
+
+    response = client.get("/trips", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == TRIPS_PAGE_SIZE + 5
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_trips_pages_follow_cursor(client, auth_headers):
+    start = date.today()
+    for offset in range(5):
+        day = str(start + timedelta(days=offset))
+        client.post("/trips", json={"name": f"Trip {offset}", "destination": "NYC", "start_date": day, "end_date": day}, headers=auth_headers)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = client.get("/trips", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        seen.extend(trip["name"] for trip in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert seen == [f"Trip {offset}" for offset in range(5)]
+
+
+def test_trips_tampered_cursor_is_rejected(client, auth_headers):
+    response = client.get("/trips", params={"cursor": "not-a-cursor"}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_events_unpaged_without_limit_or_cursor(client, auth_headers, trip):
+    events = [{"trip_id": trip["id"], "date": trip["start_date"], "title": f"Event {n}", "type": "activity"} for n in range(EVENTS_PAGE_SIZE + 5)]
+    created = client.post(f"/trips/{trip['id']}/events:batch", json={"create": events}, headers=auth_headers)
+    assert created.status_code == 200, created.text
+
+    response = client.get(f"/trips/{trip['id']}/events", headers=auth_headers)
+    assert response.status_code == 200
+    assert len(response.json()) == EVENTS_PAGE_SIZE + 5
+    assert "X-Next-Cursor" not in response.headers
+
+    paged = client.get(f"/trips/{trip['id']}/events", params={"limit": EVENTS_PAGE_SIZE}, headers=auth_headers)
+    assert len(paged.json()) == EVENTS_PAGE_SIZE
+    assert "X-Next-Cursor" in paged.headers
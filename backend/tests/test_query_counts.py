@@ -0,0 +1,81 @@
+"""Statement budgets for the child-row mutation routes.
+
+Each route loads its row, trip and caller role in one joined SELECT; the remaining statements are
+the write itself, the budget rollup deltas, the trip version bump and the refresh of the response.
+A higher count usually means an access check or lookup started issuing its own query again.
+"""
+
+from datetime import date
+
+import pytest
+
+
+@pytest.fixture
+def rows(client, auth_headers, trip):
+    trip_id = trip["id"]
+    today = str(date.today())
+    event = client.post(
+        f"/trips/{trip_id}/events",
+        json={"trip_id": trip_id, "date": today, "title": "Museum", "type": "activity"},
+        headers=auth_headers,
+    ).json()
+    envelope = client.post(
+        f"/trips/{trip_id}/envelopes",
+        json={"trip_id": trip_id, "category": "food", "planned_amount": 100},
+        headers=auth_headers,
+    ).json()
+    expense = client.post(
+        f"/trips/{trip_id}/expenses",
+        json={
+            "trip_id": trip_id,
+            "description": "Lunch",
+            "amount": 12.5,
+            "spent_at_date": today,
+            "envelope_id": envelope["id"],
+            "event_id": event["id"],
+        },
+        headers=auth_headers,
+    ).json()
+    return {"event": event, "envelope": envelope, "expense": expense}
+
+
+@pytest.mark.parametrize(
+    "method, path, payload, expected_status, max_statements",
+    [
+        # access SELECT, UPDATE event, version bump, refresh
+        ("PATCH", "/events/{event}", {"title": "Gallery"}, 200, 4),
+        # access SELECT, rollup upsert, UPDATE envelope, version bump, refresh
+        ("PATCH", "/envelopes/{envelope}", {"planned_amount": 150}, 200, 5),
+        # access SELECT, 2 category lookups, rollup upsert, UPDATE expense, version bump, refresh
+        ("PATCH", "/expenses/{expense}", {"amount": 20}, 200, 7),
+        # access SELECT, expense totals, rollup upsert, version bump, ORM cascade (load + DELETE expense), DELETE event
+        ("DELETE", "/events/{event}", None, 204, 7),
+        # access SELECT, 3 rollup upserts, expense totals, version bump,
+        # ORM cascade (load + detach expense), DELETE envelope
+        ("DELETE", "/envelopes/{envelope}", None, 204, 9),
+        # access SELECT, category lookup, rollup upsert, version bump, DELETE expense
+        ("DELETE", "/expenses/{expense}", None, 204, 5),
+    ],
+)
+def test_mutation_query_count(client, auth_headers, rows, count_queries, method, path, payload, expected_status, max_statements):
+    url = path.format(**{name: row["id"] for name, row in rows.items()})
+
+    with count_queries() as statements:
+        response = client.request(method, url, json=payload, headers=auth_headers)
+
+    assert response.status_code == expected_status, response.text
+    assert len(statements) <= max_statements, "\n".join(statements)
+
+
+@pytest.mark.parametrize("path", ["/events/{event}", "/envelopes/{envelope}", "/expenses/{expense}"])
+def test_mutation_loads_access_with_one_select(client, auth_headers, rows, count_queries, path):
+    """The row, its trip and the caller's membership come back from a single joined SELECT."""
+    url = path.format(**{name: row["id"] for name, row in rows.items()})
+
+    with count_queries() as statements:
+        response = client.request("DELETE", url, headers=auth_headers)
+
+    assert response.status_code == 204, response.text
+    first, *rest = statements
+    assert "JOIN trips" in first and "LEFT OUTER JOIN trip_members" in first
+    assert not any("FROM trips" in statement or "FROM trip_members" in statement for statement in rest), "\n".join(rest)
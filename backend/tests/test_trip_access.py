@@ -0,0 +1,45 @@
+"""Owner-only trip actions are decided by `Trip.owner_id`, not by a membership role string."""
+
+import pytest
+
+from app.db import SessionLocal
+from app.models import TripMember
+
+
+@pytest.fixture
+def owner_role_member(make_user, trip):
+    # The API no longer accepts role "owner"; a legacy row written straight to the table must not grant ownership.
+    user, headers = make_user()
+    with SessionLocal() as db:
+        db.add(TripMember(trip_id=trip["id"], user_id=user["id"], role="owner"))
+        db.commit()
+    return user, headers
+
+
+def test_member_cannot_add_owner_role(client, auth_headers, make_user, trip):
+    user, _ = make_user()
+    response = client.post(f"/trips/{trip['id']}/members", json={"user_id": user["id"], "role": "owner"}, headers=auth_headers)
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize(
+    "method, path, body",
+    [
+        ("PATCH", "/trips/{trip_id}", {"name": "Hijacked"}),
+        ("DELETE", "/trips/{trip_id}", None),
+        ("POST", "/trips/{trip_id}/members", {"user_id": "{user_id}", "role": "editor"}),
+        ("DELETE", "/trips/{trip_id}/members/{user_id}", None),
+    ],
+)
+def test_owner_role_member_cannot_act_as_owner(client, owner_role_member, trip, method, path, body):
+    user, headers = owner_role_member
+    url = path.format(trip_id=trip["id"], user_id=user["id"])
+    if body is not None:
+        body = {key: user["id"] if value == "{user_id}" else value for key, value in body.items()}
+    response = client.request(method, url, json=body, headers=headers)
+    assert response.status_code == 403, response.text
+
+
+def test_owner_role_member_keeps_read_access(client, owner_role_member, trip):
+    _, headers = owner_role_member
+    assert client.get(f"/trips/{trip['id']}", headers=headers).status_code == 200